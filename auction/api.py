@@ -0,0 +1,108 @@
+import hashlib
+import json
+from typing import Any
+from auction.models import AuctionState
+
+CONTENT_TYPE = "application/json; charset=utf-8"
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def state_payload(state: AuctionState, finished: bool = False) -> dict[str, Any]:
+    gift = state.gift
+    return {
+        "slug": gift.slug,
+        "gift_id": gift.id,
+        "title": gift.title,
+        "version": state.version,
+        "finished": finished,
+        "start_date": state.start_date,
+        "end_date": state.end_date,
+        "next_round_at": state.next_round_at,
+        "current_round": state.current_round,
+        "total_rounds": state.total_rounds,
+        "gifts_left": state.gifts_remaining,
+        "availability_total": gift.availability_total,
+        "gifts_per_round": gift.gifts_per_round,
+        "min_bid": state.min_bid_amount,
+        "average_price": state.average_price,
+        "top_bids": [[b.pos, b.amount] for b in state.top_bids()],
+    }
+
+
+class StateCache:
+    def __init__(self) -> None:
+        self.bodies: dict[str, tuple[bytes, str]] = {}
+        self._states: dict[str, tuple[AuctionState, bool]] = {}
+        self._index: tuple[bytes, str] | None = None
+        self.updates = 0
+
+    def __len__(self) -> int:
+        return len(self.bodies)
+
+    def update(self, state: AuctionState, finished: bool = False) -> None:
+        key = state.gift.slug
+        seen = self._states.get(key)
+        if seen is not None and seen[0] is state and seen[1] == finished:
+            return
+        self._states[key] = (state, finished)
+        body = json.dumps(state_payload(state, finished), separators=(",", ":"), ensure_ascii=False).encode()
+        etag = _etag(body)
+        current = self.bodies.get(key)
+        if current is not None and current[1] == etag:
+            return
+        self.bodies[key] = (body, etag)
+        self._index = None
+        self.updates += 1
+
+    def remove(self, key: str) -> None:
+        self._states.pop(key, None)
+        if self.bodies.pop(key, None) is not None:
+            self._index = None
+
+    def get(self, key: str) -> tuple[bytes, str] | None:
+        return self.bodies.get(key)
+
+    def index(self) -> tuple[bytes, str]:
+        if self._index is None:
+            body = b'{"auctions":[' + b",".join(self.bodies[k][0] for k in sorted(self.bodies)) + b"]}"
+            self._index = (body, _etag(body))
+        return self._index
+
+
+def _not_modified(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    tags = {t.strip().removeprefix("W/") for t in header.split(",")}
+    return etag in tags or "*" in tags
+
+
+async def serve_api(cache: StateCache, port: int, host: str = "127.0.0.1") -> Any:
+    from aiohttp import web
+
+    def respond(request: web.Request, entry: tuple[bytes, str]) -> web.Response:
+        body, etag = entry
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _not_modified(request.headers.get("If-None-Match"), etag):
+            return web.Response(status=304, headers=headers)
+        headers["Content-Type"] = CONTENT_TYPE
+        return web.Response(body=body, headers=headers)
+
+    async def auctions(request: web.Request) -> web.Response:
+        return respond(request, cache.index())
+
+    async def auction(request: web.Request) -> web.Response:
+        entry = cache.get(request.match_info["slug"])
+        if entry is None:
+            return web.Response(status=404, body=b'{"error":"unknown auction"}', headers={"Content-Type": CONTENT_TYPE})
+        return respond(request, entry)
+
+    app = web.Application()
+    app.router.add_get("/auctions", auctions)
+    app.router.add_get("/auctions/{slug}", auction)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -0,0 +1,42 @@
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.enums import ParseMode
+from aiogram.exceptions import TelegramBadRequest
+from loguru import logger
+from auction.flow import Sink
+from auction.pool import ChatMember, PooledChat, pooled_limiter
+from auction.publisher import ChatUnavailable, Publisher
+from auction.ratelimit import RateLimiter
+from auction.render import BOT_API, Renderer
+from auction.store import TrackerStore
+
+
+def create_bot(token: str) -> Bot:
+    return Bot(token=token, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+
+
+class BotApiChat:
+    def __init__(self, bot: Bot) -> None:
+        self.bot = bot
+
+    async def send(self, chat: int | str, text: str, key: str = "") -> int:
+        try:
+            msg = await self.bot.send_message(chat_id=chat, text=text)
+        except TelegramBadRequest as e:
+            if "chat not found" in str(e).lower():
+                raise ChatUnavailable(str(e)) from e
+            raise
+        return msg.message_id
+
+    async def edit(self, chat: int | str, message_id: int, text: str, key: str = "") -> None:
+        try:
+            await self.bot.edit_message_text(chat_id=chat, message_id=message_id, text=text)
+        except TelegramBadRequest as e:
+            logger.error(f"Edit failed: {e}")
+
+
+def bot_sink(bots: list[Bot], chats: list[int | str], limiter: RateLimiter, store: TrackerStore | None = None) -> Sink:
+    if len(bots) == 1:
+        return Sink("bot", Renderer(BOT_API), Publisher.for_chats("bot", chats, BotApiChat(bots[0]), limiter, store))
+    pool = PooledChat([ChatMember(f"bot:{b.id}", BotApiChat(b), RateLimiter(retries=0, flood_scope="chat")) for b in bots])
+    return Sink("bot", Renderer(BOT_API), Publisher.for_chats("bot", chats, pool, pooled_limiter(len(bots), flood_scope="chat"), store))
@@ -0,0 +1,41 @@
+from typing import Any
+from pyrogram.raw import functions as raw_functions
+from pyrogram.raw import types as raw_types
+from auction.models import auction_key
+from auction.ratelimit import RateLimiter
+from auction.transport import RpcTransport
+
+
+def is_active_auction(gift: Any) -> bool:
+    return bool(getattr(gift, "auction", False)) and not getattr(gift, "sold_out", False)
+
+
+class GiftCatalogue:
+    def __init__(self, app: RpcTransport, limiter: RateLimiter | None = None) -> None:
+        self.app = app
+        self.limiter = limiter
+        self.hash = 0
+        self.gifts: list[Any] = []
+        self.auctions: dict[str, Any] = {}
+        self.removed: set[str] = set()
+        self.fetches = 0
+        self.not_modified = 0
+
+    async def refresh(self) -> list[Any]:
+        query = raw_functions.payments.GetStarGifts(hash=self.hash)
+        if self.limiter is not None:
+            res = await self.limiter.invoke(self.app, query)
+        else:
+            res = await self.app.invoke(query)
+        self.fetches += 1
+        if isinstance(res, raw_types.payments.StarGiftsNotModified):
+            self.not_modified += 1
+            self.removed = set()
+            return []
+        self.hash = getattr(res, "hash", 0) or 0
+        self.gifts = list(getattr(res, "gifts", []) or [])
+        current = {auction_key(g): g for g in self.gifts if is_active_auction(g)}
+        added = current.keys() - self.auctions.keys()
+        self.removed = self.auctions.keys() - current.keys()
+        self.auctions = current
+        return [g for k, g in current.items() if k in added]
@@ -0,0 +1,26 @@
+import time
+from collections import deque
+from typing import Any
+
+class ServerClock:
+    def __init__(self, window: int = 32) -> None:
+        self.offset = 0.0
+        self.rtt = 0.0
+        self.samples: deque[tuple[float, float]] = deque(maxlen=window)
+
+    def observe(self, server_ts: float, sent_at: float, received_at: float) -> None:
+        rtt = max(0.0, received_at - sent_at)
+        self.samples.append((rtt, server_ts - (sent_at + received_at) / 2))
+        self.rtt, self.offset = min(self.samples)
+
+    def sample(self, app: Any, sent_at: float, received_at: float) -> None:
+        server_time = getattr(app, "server_time", None)
+        if not isinstance(server_time, float):
+            return
+        self.observe(server_time - time.time() + received_at, sent_at, received_at)
+
+    def now(self) -> float:
+        return time.time() + self.offset
+
+    def until(self, ts: float) -> float:
+        return ts - self.now()
@@ -0,0 +1,140 @@
+import asyncio
+import os
+from dataclasses import dataclass
+from loguru import logger
+from auction.engine import Engine
+from auction.flow import Cadence, Sink
+from auction.history import HistoryRecorder
+from auction.lease import SqliteLeases
+from auction.mtproto import create_client, userbot_sink
+from auction.pool import RpcMember, SessionPool
+from auction.publisher import target_chats
+from auction.ratelimit import RateLimiter
+from auction.store import TrackerStore
+from auction.updates import PushHub
+
+OUTPUTS = frozenset({"bot", "userbot"})
+
+
+@dataclass(slots=True, frozen=True)
+class Settings:
+    api_id: int
+    api_hash: str
+    outputs: frozenset[str]
+    bot_tokens: tuple[str, ...]
+    sessions: tuple[str, ...]
+    channel_ids: str | None
+    state_db: str
+    history_dir: str
+    stale_after: float
+    push_updates: bool
+    push_silence: float
+    metrics_port: int | None
+    api_port: int | None
+    api_host: str
+    node_id: str | None
+    lease_ttl: float
+
+
+def _list(value: str | None) -> tuple[str, ...]:
+    return tuple(v.strip() for v in (value or "").split(",") if v.strip())
+
+
+def load_settings(outputs: str | None = None, state_db: str = "state.db") -> Settings | None:
+    api_id = os.getenv("API_ID")
+    api_hash = os.getenv("API_HASH")
+    bot_tokens = _list(os.getenv("BOT_TOKENS") or os.getenv("BOT_TOKEN"))
+    selected = frozenset(_list(outputs or os.getenv("OUTPUTS") or ("bot,userbot" if bot_tokens else "userbot")))
+    push_updates = (os.getenv("PUSH_UPDATES") or "").lower() in ("1", "true", "yes")
+
+    if not api_id or not api_hash:
+        logger.error("Missing API_ID or API_HASH in environment")
+        return None
+
+    try:
+        api_id = int(api_id)
+    except ValueError:
+        logger.error("API_ID must be an integer")
+        return None
+
+    unknown = selected - OUTPUTS
+    if unknown or not selected:
+        logger.error(f"OUTPUTS must list bot and/or userbot, got {', '.join(sorted(unknown)) or 'nothing'}")
+        return None
+
+    if "bot" in selected and not bot_tokens:
+        logger.error("Missing BOT_TOKEN in environment")
+        return None
+
+    return Settings(
+        api_id=api_id,
+        api_hash=api_hash,
+        outputs=selected,
+        bot_tokens=bot_tokens,
+        sessions=_list(os.getenv("SESSIONS")) or ("account",),
+        channel_ids=os.getenv("CHANNEL_IDS") or os.getenv("CHANNEL_ID"),
+        state_db=os.getenv("STATE_DB") or state_db,
+        history_dir=os.getenv("HISTORY_DIR") or "history",
+        stale_after=float(os.getenv("EDIT_STALE_AFTER") or 180),
+        push_updates=push_updates,
+        push_silence=float(os.getenv("PUSH_SILENCE") or 90) if push_updates else 0.0,
+        metrics_port=int(os.getenv("METRICS_PORT") or 0) or None,
+        api_port=int(os.getenv("READ_API_PORT") or 0) or None,
+        api_host=os.getenv("READ_API_HOST") or "127.0.0.1",
+        node_id=os.getenv("NODE_ID"),
+        lease_ttl=float(os.getenv("LEASE_TTL") or 30),
+    )
+
+
+async def run_engine(settings: Settings) -> None:
+    clients = [
+        create_client(settings.api_id, settings.api_hash, os.getcwd(), no_updates=not settings.push_updates, name=n)
+        for n in settings.sessions
+    ]
+    push = PushHub() if settings.push_updates else None
+    if push is not None:
+        for c in clients:
+            push.attach(c)
+
+    await asyncio.gather(*(c.start() for c in clients))
+    bots = []
+    try:
+        if len(clients) > 1:
+            app = SessionPool([RpcMember(c.name, c) for c in clients])
+            logger.info(f"Polling through {len(clients)} sessions: {', '.join(settings.sessions)}")
+        else:
+            app = clients[0]
+        store = TrackerStore(settings.state_db)
+        chats = target_chats(settings.channel_ids)
+        sinks: list[Sink] = []
+        if "bot" in settings.outputs:
+            from auction.bot_api import bot_sink, create_bot
+
+            bots = [create_bot(t) for t in settings.bot_tokens]
+            sinks.append(bot_sink(bots, chats, RateLimiter(flood_scope="chat"), store))
+        if "userbot" in settings.outputs:
+            sinks.append(userbot_sink(clients, chats, RateLimiter(flood_scope="method"), store))
+        if bots:
+            cadence = Cadence(slow=30, fast=10, window=70, stale_after=settings.stale_after, push_silence=settings.push_silence)
+        else:
+            cadence = Cadence(stale_after=settings.stale_after, push_silence=settings.push_silence)
+        engine = Engine(
+            app,
+            sinks,
+            RateLimiter(),
+            cadence=cadence,
+            store=store,
+            recorder=HistoryRecorder(settings.history_dir),
+            push=push,
+            metrics_port=settings.metrics_port,
+            leases=SqliteLeases(settings.state_db) if settings.node_id else None,
+            node=settings.node_id or "local",
+            lease_ttl=settings.lease_ttl,
+            api_port=settings.api_port,
+            api_host=settings.api_host,
+        )
+        await engine.run()
+    finally:
+        for b in bots:
+            await b.session.close()
+        await asyncio.gather(*(c.stop() for c in clients if c.is_connected), return_exceptions=True)
@@ -0,0 +1,337 @@
+import asyncio
+import time
+from typing import Any
+from loguru import logger
+from auction.api import StateCache, serve_api
+from auction.catalogue import GiftCatalogue
+from auction.clock import ServerClock
+from auction.flow import AuctionFlow, Cadence, Sink
+from auction.history import HistoryRecorder
+from auction.lease import LeaseStore
+from auction.metrics import (
+    ACTIVE_AUCTIONS,
+    INFLIGHT_POLLS,
+    PUBLISH_QUEUE,
+    PUBLISHED,
+    RATELIMIT_FILL,
+    SCHEDULED_POLLS,
+    SESSION_AVAILABLE,
+    SESSION_FAILURES,
+    serve_metrics,
+)
+from auction.models import auction_key
+from auction.pool import PooledChat, SessionPool
+from auction.ratelimit import RateLimiter
+from auction.scheduler import PollScheduler
+from auction.store import FlowRecord, TrackerStore
+from auction.tracker import AuctionStateTracker
+from auction.transport import RpcTransport
+from auction.updates import PushHub
+
+
+class Engine:
+    def __init__(
+        self,
+        app: RpcTransport,
+        sinks: list[Sink],
+        limiter: RateLimiter,
+        cadence: Cadence = Cadence(),
+        store: TrackerStore | None = None,
+        recorder: HistoryRecorder | None = None,
+        push: PushHub | None = None,
+        clock: ServerClock | None = None,
+        scheduler: PollScheduler | None = None,
+        metrics_port: int | None = None,
+        leases: LeaseStore | None = None,
+        node: str = "local",
+        lease_ttl: float = 30.0,
+        api_port: int | None = None,
+        api_host: str = "127.0.0.1",
+    ) -> None:
+        self.app = app
+        self.sinks = sinks
+        self.limiter = limiter
+        self.cadence = cadence
+        self.store = store
+        self.recorder = recorder
+        self.push = push
+        self.metrics_port = metrics_port
+        self.leases = leases
+        self.node = node
+        self.lease_ttl = lease_ttl
+        self.done: set[str] = set()
+        self.lease_until: dict[str, float] = {}
+        self._leasing = asyncio.Lock()
+        self._lease_io: set[asyncio.Task] = set()
+        self.api_port = api_port
+        self.api_host = api_host
+        self.cache = StateCache() if api_port else None
+        self.clock = clock if clock is not None else ServerClock()
+        self.scheduler = scheduler if scheduler is not None else PollScheduler()
+        self.pooled = isinstance(app, SessionPool)
+        self.catalogue = GiftCatalogue(app, None if self.pooled else limiter)
+        self.flows: dict[str, AuctionFlow] = {}
+        self.saved = store.load_all() if store is not None else {}
+        if self.saved:
+            logger.info(f"Restored {len(self.saved)} tracked auction(s) from {store.path}")
+
+    def track(self, gift: Any, schedule: bool = True) -> AuctionFlow:
+        key = auction_key(gift)
+        flow = self.flows.get(key)
+        if flow is None:
+            flow = AuctionFlow(
+                self._tracker(key, gift),
+                self.sinks,
+                cadence=self.cadence,
+                store=self.store,
+                recorder=self.recorder,
+            )
+            if key in self.saved:
+                flow.restore(self.saved.pop(key))
+            self.flows[key] = flow
+            if schedule:
+                self.scheduler.schedule(key, lambda: self._step(flow))
+            if self.push is not None:
+                self.push.subscribe(flow.tracker.gift.id, lambda st: self._on_push(flow, st))
+        return flow
+
+    def _tracker(self, key: str, gift: Any) -> AuctionStateTracker:
+        if self.pooled:
+            return AuctionStateTracker(self.app.shard(key), gift, None, self.clock)
+        return AuctionStateTracker(self.app, gift, self.limiter, self.clock)
+
+    def _acquire(self, keys: list[str]) -> dict[str, tuple[FlowRecord | None, dict[str, int]]]:
+        claimed = {}
+        for key in keys:
+            if not self.leases.acquire(key, self.node, self.lease_ttl):
+                continue
+            if self.store is None:
+                claimed[key] = (None, {})
+                continue
+            names = [d.name for sink in self.sinks for d in sink.publisher.destinations]
+            msg_ids = {n: self.store.load_message(n, key) for n in names}
+            claimed[key] = (self.store.load(key), {n: m for n, m in msg_ids.items() if m is not None})
+        return claimed
+
+    async def _claim(self, gifts: list[Any]) -> list[Any]:
+        if self.leases is None:
+            return gifts
+        async with self._leasing:
+            wanted = {auction_key(g): g for g in gifts}
+            keys = [k for k in wanted if k not in self.flows and k not in self.done]
+            if not keys:
+                return []
+            t0 = time.monotonic()
+            claimed = await asyncio.to_thread(self._acquire, keys)
+            for key, (rec, msg_ids) in claimed.items():
+                self.lease_until[key] = t0 + self.lease_ttl
+                if rec is not None:
+                    self.saved[key] = rec
+                for sink in self.sinks:
+                    sink.publisher.adopt(key, msg_ids)
+            return [wanted[k] for k in claimed]
+
+    def _lose(self, key: str, reason: str) -> None:
+        self.retire(key, reason)
+        self.lease_until.pop(key, None)
+        for sink in self.sinks:
+            sink.publisher.drop(key)
+
+    async def renew_leases(self) -> None:
+        async with self._leasing:
+            t0 = time.monotonic()
+            held = await asyncio.to_thread(self.leases.renew, self.node, self.lease_ttl)
+            for key in held:
+                self.lease_until[key] = t0 + self.lease_ttl
+            lost = [k for k in self.flows if k not in held]
+            holders = await asyncio.to_thread(self.leases.holders) if lost else {}
+            for key in lost:
+                self._lose(key, f"lease taken over by {holders.get(key, 'another node')}")
+        for g in await self._claim(list(self.catalogue.auctions.values())):
+            logger.bind(slug=auction_key(g)).info(f"Node {self.node} took over {auction_key(g)}")
+            self.track(g)
+        ACTIVE_AUCTIONS.set(len(self.flows))
+
+    def _expire_leases(self) -> float:
+        now = time.monotonic()
+        for key in [k for k in self.flows if self.lease_until.get(k, 0.0) <= now]:
+            self._lose(key, "lease expired before it could be renewed")
+        return min((self.lease_until[k] for k in self.flows), default=now + self.lease_ttl)
+
+    async def _hold_leases(self) -> None:
+        renew_at = 0.0
+        while True:
+            if time.monotonic() >= renew_at:
+                try:
+                    await self.renew_leases()
+                except Exception as e:
+                    logger.error(f"Lease renewal failed: {e}")
+                renew_at = time.monotonic() + self.lease_ttl / 3
+            expires_at = self._expire_leases()
+            await asyncio.sleep(max(0.0, min(renew_at, expires_at) - time.monotonic()))
+
+    def _on_push(self, flow: AuctionFlow, st: Any) -> None:
+        if flow.tracker.push(st) and self.flows.get(flow.slug) is flow and not flow.finished_sent:
+            self.scheduler.schedule(flow.slug, lambda: self._step(flow))
+
+    async def _step(self, flow: AuctionFlow) -> float | None:
+        delay = await flow.step()
+        if self.cache is not None and flow.tracker.state is not None:
+            self.cache.update(flow.tracker.state, flow.finished_sent)
+        if delay is None:
+            self.done.add(flow.slug)
+            self.retire(flow.slug, "finished")
+        return delay
+
+    def retire(self, key: str, reason: str, forget: bool = False) -> None:
+        flow = self.flows.pop(key, None)
+        self.scheduler.cancel(key)
+        if flow is not None and self.push is not None:
+            self.push.unsubscribe(flow.tracker.gift.id)
+        if self.recorder is not None:
+            self.recorder.close(key)
+        if self.pooled:
+            self.app.release(key)
+        if self.cache is not None and key not in self.done:
+            self.cache.remove(key)
+        if forget:
+            if self.cache is not None:
+                self.cache.remove(key)
+            self.done.discard(key)
+            if self.leases is not None:
+                self._spawn(self._release(key))
+                self.lease_until.pop(key, None)
+            for sink in self.sinks:
+                sink.publisher.forget(key)
+            if self.store is not None:
+                self.store.delete(key)
+        ACTIVE_AUCTIONS.set(len(self.flows))
+        if flow is not None:
+            logger.bind(slug=key).info(f"Stopped following {key} ({reason}); {len(self.flows)} auction(s) left")
+
+    def _spawn(self, coro: Any) -> None:
+        task = asyncio.create_task(coro)
+        self._lease_io.add(task)
+        task.add_done_callback(self._lease_io.discard)
+
+    async def _release(self, key: str) -> None:
+        try:
+            await asyncio.to_thread(self.leases.release, key, self.node)
+        except Exception as e:
+            logger.bind(slug=key).error(f"Could not release the lease on {key}: {e}")
+
+    def stats(self) -> dict[str, int]:
+        return {"auctions": len(self.flows), "scheduled": len(self.scheduler), "inflight": self.scheduler.inflight}
+
+    def _pools(self) -> dict[str, SessionPool | PooledChat]:
+        pools: dict[str, SessionPool | PooledChat] = {"poll": self.app} if self.pooled else {}
+        for sink in self.sinks:
+            for d in sink.publisher.destinations:
+                if isinstance(d.transport, PooledChat):
+                    pools[sink.name] = d.transport
+        return pools
+
+    def _limiters(self) -> dict[str, RateLimiter]:
+        limiters = {"poll": self.limiter}
+        for sink in self.sinks:
+            for d in sink.publisher.destinations:
+                limiters[sink.name] = d.limiter
+        for pool_name, pool in self._pools().items():
+            for name, m in pool.members.items():
+                limiters[f"{pool_name}:{name}"] = m.limiter
+        return limiters
+
+    def export_stats(self) -> None:
+        stats = self.stats()
+        ACTIVE_AUCTIONS.set(stats["auctions"])
+        SCHEDULED_POLLS.set(stats["scheduled"])
+        INFLIGHT_POLLS.set(stats["inflight"])
+        for name, limiter in self._limiters().items():
+            for bucket, fill in limiter.stats().items():
+                RATELIMIT_FILL.set(fill, name, bucket)
+        for sink in self.sinks:
+            for dest, counts in sink.publisher.stats().items():
+                PUBLISH_QUEUE.set(counts.pop("queued"), dest)
+                for result, n in counts.items():
+                    PUBLISHED.set(n, dest, result)
+        for pool_name, pool in self._pools().items():
+            for session, s in pool.stats().items():
+                SESSION_AVAILABLE.set(int(s["available"]), pool_name, session)
+                SESSION_FAILURES.set(s["flood_waits"], pool_name, session, "flood_wait")
+                SESSION_FAILURES.set(s["disconnects"], pool_name, session, "disconnect")
+
+    async def discover(self) -> float:
+        for g in await self._claim(await self.catalogue.refresh()):
+            self.track(g)
+        removed = list(self.catalogue.removed)
+        await asyncio.gather(*(self._finish(self.flows[k]) for k in removed if k in self.flows))
+        for key in removed:
+            self.retire(key, "left the catalogue", forget=True)
+        ACTIVE_AUCTIONS.set(len(self.flows))
+        if not self.catalogue.auctions:
+            logger.info("No auctions found; retry in 30s")
+        return 30
+
+    async def _finish(self, flow: AuctionFlow) -> None:
+        self.scheduler.cancel(flow.slug)
+        try:
+            await flow.finish()
+        except Exception as e:
+            logger.bind(slug=flow.slug).error(f"Could not post the finish message: {e}")
+
+    async def _first_step(self, flow: AuctionFlow) -> None:
+        try:
+            delay = await self._step(flow)
+        except Exception as e:
+            logger.bind(slug=flow.slug).error(f"Update loop error: {e}")
+            delay = self.scheduler.retry_delay
+        if delay is not None:
+            self.scheduler.schedule(flow.slug, lambda: self._step(flow), delay)
+
+    async def bootstrap(self) -> float:
+        try:
+            gifts = await self.catalogue.refresh()
+        except Exception as e:
+            logger.error(f"Catalogue fetch failed: {e}")
+            return self.scheduler.retry_delay
+        flows = [self.track(g, schedule=False) for g in await self._claim(gifts)]
+        ACTIVE_AUCTIONS.set(len(self.flows))
+        await asyncio.gather(*(self._first_step(f) for f in flows))
+        logger.info(f"Started {len(flows)} auction(s)")
+        return 30
+
+    async def _serve_metrics(self) -> Any:
+        if not self.metrics_port:
+            return None
+        runner = await serve_metrics(self.metrics_port, collect=self.export_stats)
+        logger.info(f"Serving metrics on http://127.0.0.1:{self.metrics_port}/metrics")
+        return runner
+
+    async def _serve_api(self) -> Any:
+        if self.cache is None:
+            return None
+        runner = await serve_api(self.cache, self.api_port, self.api_host)
+        logger.info(f"Serving auction state on http://{self.api_host}:{self.api_port}/auctions")
+        return runner
+
+    async def run(self) -> None:
+        logger.info(f"Publishing to {', '.join(d.name for s in self.sinks for d in s.publisher.destinations)}")
+        for sink in self.sinks:
+            sink.publisher.start()
+        metrics = api = None
+        leases = asyncio.create_task(self._hold_leases()) if self.leases is not None else None
+        try:
+            metrics, api, delay = await asyncio.gather(self._serve_metrics(), self._serve_api(), self.bootstrap())
+            self.scheduler.schedule(":catalogue", self.discover, delay)
+            await self.scheduler.run()
+        finally:
+            if leases is not None:
+                leases.cancel()
+                await asyncio.gather(leases, return_exceptions=True)
+            for sink in self.sinks:
+                await sink.publisher.close()
+            for runner in (metrics, api):
+                if runner is not None:
+                    await runner.cleanup()
+            if self.leases is not None:
+                await asyncio.gather(*self._lease_io, *(self._release(k) for k in list(self.flows)))
@@ -0,0 +1,286 @@
+import asyncio
+import bisect
+import itertools
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Iterable
+from pyrogram.errors import FloodWait
+from pyrogram.raw import functions as raw_functions
+from pyrogram.raw import types as raw_types
+from auction.clock import ServerClock
+from auction.history import Series
+from auction.updates import PushHub
+
+
+class ScaledClock(ServerClock):
+    def __init__(self, speed: float = 1.0, origin: float | None = None) -> None:
+        super().__init__()
+        self.speed = speed
+        self.started = time.time()
+        self.origin = self.started if origin is None else origin
+
+    def sample(self, app: Any, sent_at: float, received_at: float) -> None:
+        return
+
+    def now(self) -> float:
+        return self.origin + (time.time() - self.started) * self.speed
+
+
+class ManualClock(ScaledClock):
+    def __init__(self, origin: float = 0.0) -> None:
+        super().__init__(1.0, origin)
+
+    def now(self) -> float:
+        return self.origin
+
+    def advance(self, seconds: float) -> None:
+        self.origin += seconds
+
+
+@dataclass(slots=True)
+class FakeGift:
+    id: int
+    auction_slug: str
+    title: str
+    availability_total: int
+    availability_remains: int
+    gifts_per_round: int
+    auction: bool = True
+    sold_out: bool = False
+
+
+@dataclass(slots=True, frozen=True)
+class Keyframe:
+    at: float
+    version: int
+    current_round: int
+    next_round_at: int
+    gifts_left: int
+    min_bid_amount: int
+    levels: tuple[tuple[int, int], ...]
+
+
+class AuctionScript:
+    def __init__(
+        self,
+        gift: FakeGift,
+        frames: list[Keyframe],
+        start: int,
+        end: int,
+        total_rounds: int,
+        floods: tuple[tuple[float, float], ...] = (),
+    ) -> None:
+        self.gift = gift
+        self.frames = sorted(frames, key=lambda f: f.at)
+        self.start = start
+        self.end = end
+        self.total_rounds = total_rounds
+        self.floods = floods
+        self._at = [f.at for f in self.frames]
+        self._states: dict[int, Any] = {}
+
+    @property
+    def boundaries(self) -> list[int]:
+        return sorted({f.next_round_at for f in self.frames if f.next_round_at < self.end})
+
+    def frame_at(self, t: float) -> Keyframe | None:
+        i = bisect.bisect_right(self._at, t)
+        if not self.frames:
+            return None
+        return self.frames[max(i, 1) - 1]
+
+    def flood_left(self, t: float) -> float:
+        for a, b in self.floods:
+            if a <= t < b:
+                return b - t
+        return 0.0
+
+    def state_at(self, t: float, version: int) -> Any:
+        if t >= self.end:
+            last = self.frames[-1] if self.frames else None
+            return raw_types.StarGiftAuctionStateFinished(
+                start_date=self.start,
+                end_date=self.end,
+                average_price=last.min_bid_amount if last else 0,
+            )
+        frame = self.frame_at(t)
+        if frame is None or frame.version == version:
+            return raw_types.StarGiftAuctionStateNotModified()
+        state = self._states.get(frame.version)
+        if state is None:
+            state = self._states[frame.version] = self._build(frame)
+        return state
+
+    def _build(self, frame: Keyframe) -> Any:
+        return raw_types.StarGiftAuctionState(
+            version=frame.version,
+            start_date=self.start,
+            end_date=self.end,
+            min_bid_amount=frame.min_bid_amount,
+            bid_levels=[raw_types.AuctionBidLevel(pos=p, amount=a, date=int(frame.at)) for p, a in frame.levels],
+            top_bidders=[],
+            next_round_at=frame.next_round_at,
+            last_gift_num=0,
+            gifts_left=frame.gifts_left,
+            current_round=frame.current_round,
+            total_rounds=self.total_rounds,
+            rounds=[],
+        )
+
+
+def synthetic_script(
+    gift_id: int,
+    start: int,
+    rounds: int = 5,
+    round_seconds: int = 300,
+    per_round: int = 10,
+    bid_interval: float = 15.0,
+    levels: int = 50,
+    floods: tuple[tuple[float, float], ...] = (),
+    seed: int | None = None,
+) -> AuctionScript:
+    rnd = random.Random(gift_id if seed is None else seed)
+    gift = FakeGift(gift_id, f"fake-{gift_id}", f"Fake Gift {gift_id}", per_round * rounds, per_round * rounds, per_round)
+    end = start + rounds * round_seconds
+    frames: list[Keyframe] = []
+    amounts = sorted((rnd.randint(100, 1_000) for _ in range(levels)), reverse=True)
+    t = float(start)
+    version = 1
+    while t < end:
+        current = int((t - start) // round_seconds) + 1
+        amounts = sorted((a + rnd.randint(0, 50) for a in amounts), reverse=True)
+        frames.append(
+            Keyframe(
+                at=t,
+                version=version,
+                current_round=current,
+                next_round_at=start + current * round_seconds,
+                gifts_left=per_round * (rounds - current + 1),
+                min_bid_amount=amounts[min(per_round, levels) - 1],
+                levels=tuple((i + 1, a) for i, a in enumerate(amounts)),
+            )
+        )
+        version += 1
+        t += bid_interval
+    return AuctionScript(gift, frames, start, end, rounds, floods)
+
+
+def script_from_series(series: Series, gift: FakeGift, floods: tuple[tuple[float, float], ...] = ()) -> AuctionScript:
+    ts = series.column("ts")
+    rounds = series.column("round")
+    closes: dict[int, int] = {}
+    for i, r in enumerate(rounds):
+        if i and r != rounds[i - 1]:
+            closes[rounds[i - 1]] = ts[i]
+    end = ts[-1] + 1 if ts else 0
+    frames = []
+    for i in range(len(series)):
+        _, version, current, min_bid, gifts_left, _, _ = series.row(i)
+        lv = series.levels(i)
+        frames.append(
+            Keyframe(
+                at=float(ts[i]),
+                version=version,
+                current_round=current,
+                next_round_at=closes.get(current, end),
+                gifts_left=gifts_left,
+                min_bid_amount=min_bid,
+                levels=tuple(zip(lv[0::2].tolist(), lv[1::2].tolist())),
+            )
+        )
+    return AuctionScript(gift, frames, ts[0] if ts else 0, end, max(rounds, default=0), floods)
+
+
+class FakeTelegram:
+    def __init__(self, scripts: list[AuctionScript], clock: ScaledClock, timeout: int = 30, linger: float = 60.0) -> None:
+        self.clock = clock
+        self.timeout = timeout
+        self.linger = linger
+        self.by_id = {s.gift.id: s for s in scripts}
+        self.by_slug = {s.gift.auction_slug: s for s in scripts}
+        self.calls: Counter[str] = Counter()
+        self.flood_waits = 0
+
+    @property
+    def server_time(self) -> float:
+        return self.clock.now()
+
+    def _script(self, auction: Any) -> AuctionScript:
+        script = self.by_slug.get(getattr(auction, "slug", None)) or self.by_id.get(getattr(auction, "gift_id", None))
+        if script is None:
+            raise ValueError(f"Unknown auction {auction}")
+        return script
+
+    def _flood(self, left: float) -> None:
+        self.flood_waits += 1
+        raise FloodWait(value=max(1, math.ceil(left / self.clock.speed)))
+
+    async def invoke(self, query: Any) -> Any:
+        self.calls[type(query).__name__] += 1
+        now = self.clock.now()
+        if isinstance(query, raw_functions.payments.GetStarGifts):
+            live = [s.gift for s in self.by_id.values() if now < s.end + self.linger]
+            h = hash(tuple(g.id for g in live)) & 0x7FFFFFFF
+            if query.hash == h:
+                return raw_types.payments.StarGiftsNotModified()
+            return raw_types.payments.StarGifts(hash=h, gifts=live, chats=[], users=[])
+        if isinstance(query, raw_functions.payments.GetStarGiftAuctionState):
+            script = self._script(query.auction)
+            left = script.flood_left(now)
+            if left:
+                self._flood(left)
+            return raw_types.payments.StarGiftAuctionState(
+                gift=script.gift,
+                state=script.state_at(now, query.version),
+                user_state=None,
+                timeout=self.timeout,
+                users=[],
+                chats=[],
+            )
+        raise ValueError(f"FakeTelegram does not handle {type(query).__name__}")
+
+
+class FakeChat:
+    def __init__(self, clock: ServerClock, latency: float = 0.0) -> None:
+        self.clock = clock
+        self.latency = latency
+        self.messages: dict[tuple[Any, int], str] = {}
+        self.events: list[tuple[float, str, Any, int, str]] = []
+        self._ids = itertools.count(1)
+
+    async def send(self, chat: Any, text: str, key: str = "") -> int:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        msg_id = next(self._ids)
+        self.messages[(chat, msg_id)] = text
+        self.events.append((self.clock.now(), "send", chat, msg_id, text))
+        return msg_id
+
+    async def edit(self, chat: Any, message_id: int, text: str, key: str = "") -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if (chat, message_id) not in self.messages:
+            raise ValueError(f"Message {message_id} not found in {chat}")
+        self.messages[(chat, message_id)] = text
+        self.events.append((self.clock.now(), "edit", chat, message_id, text))
+
+
+class FakeUpdateSource:
+    def __init__(self, hub: PushHub) -> None:
+        self.hub = hub
+        self.sent = 0
+
+    def emit(self, gift_id: int, state: Any) -> bool:
+        self.sent += 1
+        return self.hub.dispatch(raw_types.UpdateStarGiftAuctionState(gift_id=gift_id, state=state))
+
+    async def replay(self, events: Iterable[tuple[float, int, Any]], speed: float = 1.0) -> None:
+        start = time.monotonic()
+        for at, gift_id, state in events:
+            wait = at / speed - (time.monotonic() - start)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.emit(gift_id, state)
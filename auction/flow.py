@@ -0,0 +1,197 @@
+import time
+from dataclasses import dataclass
+from loguru import logger
+from auction.history import HistoryRecorder
+from auction.metrics import EDITS, ROUND_TRANSITION
+from auction.models import AuctionState
+from auction.publisher import Priority, Publisher
+from auction.render import Renderer
+from auction.stats import summarize
+from auction.store import FlowRecord, TrackerStore
+from auction.tracker import AuctionStateTracker
+
+
+@dataclass(slots=True, frozen=True)
+class Cadence:
+    slow: float = 60
+    fast: float = 30
+    window: int = 60
+    boundary: int = 10
+    confirm_attempts: int = 6
+    confirm_interval: float = 0.25
+    confirm_backoff: float = 2.0
+    confirm_max: float = 8.0
+    guard: float = 0.15
+    push_silence: float = 0.0
+    stale_after: float = 180
+
+
+@dataclass(slots=True, frozen=True)
+class Sink:
+    name: str
+    renderer: Renderer
+    publisher: Publisher
+
+
+class AuctionFlow:
+    def __init__(
+        self,
+        tracker: AuctionStateTracker,
+        sinks: list[Sink],
+        cadence: Cadence = Cadence(),
+        store: TrackerStore | None = None,
+        recorder: HistoryRecorder | None = None,
+    ) -> None:
+        self.tracker = tracker
+        self.sinks = sinks
+        self.cadence = cadence
+        self.store = store
+        self.recorder = recorder
+        self.posted = False
+        self.last_round = 0
+        self.last_next_round_at = 0
+        self.last_text: dict[str, str] = {}
+        self.finished_sent = False
+        self.last_fingerprint = ""
+        self.last_edit_at = 0.0
+        self.edits_sent = 0
+        self.edits_skipped = 0
+        self._confirm_left = 0
+        self._confirm_delay = 0.0
+
+    @property
+    def slug(self) -> str:
+        return self.tracker.slug
+
+    def restore(self, rec: FlowRecord) -> None:
+        self.posted = True
+        self.last_round = rec.round
+        self.last_fingerprint = rec.fingerprint
+        self.last_text = dict(rec.texts)
+        self.finished_sent = rec.finished
+        self.last_edit_at = time.monotonic()
+
+    def persist(self) -> None:
+        if self.store is None or not self.posted:
+            return
+        self.store.save(
+            FlowRecord(
+                key=self.slug,
+                round=self.last_round,
+                fingerprint=self.last_fingerprint,
+                texts=self.last_text,
+                finished=self.finished_sent,
+            )
+        )
+
+    def _post(self, sink: Sink, text: str, priority: Priority = Priority.ROUND) -> None:
+        sink.publisher.post(self.slug, text, priority)
+        self.last_text[sink.name] = text
+
+    def _edit(self, sink: Sink, text: str, priority: Priority = Priority.REFRESH) -> None:
+        sink.publisher.edit(self.slug, text, priority)
+        self.last_text[sink.name] = text
+
+    async def _post_round(self, state: AuctionState) -> None:
+        if self.posted and state.current_round != self.last_round and self.last_next_round_at:
+            ROUND_TRANSITION.observe(max(0.0, self.tracker.clock.now() - self.last_next_round_at))
+        self.last_next_round_at = state.next_round_at
+        for sink in self.sinks:
+            self._post(sink, sink.renderer.render(state, self.tracker.clock.now()))
+        self.posted = True
+        self.last_round = state.current_round or self.last_round
+        self.last_fingerprint = state.fingerprint()
+        self.last_edit_at = time.monotonic()
+        self._confirm_left = 0
+        self.persist()
+
+    async def step(self) -> float | None:
+        if self.finished_sent:
+            return None
+        state = await self.tracker.fetch()
+        now = self.tracker.clock.now()
+        if self.recorder is not None:
+            self.recorder.append(self.slug, state, int(now))
+        remain_next = max(0.0, state.next_round_at - now) if state.next_round_at else self.cadence.slow
+        period = self.cadence.fast if remain_next <= self.cadence.window else self.cadence.slow
+        period = max(period, self._push_quiet_left(state))
+        if remain_next > 0:
+            period = min(period, remain_next + self.cadence.guard)
+
+        if not self.posted:
+            await self._post_round(state)
+            logger.bind(slug=self.slug).info(f"Initial auction message queued for {self.slug}")
+            return period
+
+        if self._confirm_left:
+            if state.current_round == self.last_round and self._confirm_left > 1:
+                self._confirm_left -= 1
+                self._confirm_delay = min(self._confirm_delay * self.cadence.confirm_backoff, self.cadence.confirm_max)
+                return self._confirm_delay
+            await self._post_round(state)
+            return period
+
+        if 0 < remain_next <= self.cadence.boundary:
+            return remain_next + self.cadence.guard
+
+        if state.end_date and state.end_date <= now and not self.finished_sent:
+            await self._post_finished(state)
+            return None
+        elif remain_next <= 0 or state.current_round != self.last_round:
+            for sink in self.sinks:
+                text = self.last_text.get(sink.name)
+                if text:
+                    self._edit(sink, sink.renderer.round_ended(text), Priority.ROUND_ENDED)
+            self.persist()
+            if state.current_round == self.last_round:
+                self._confirm_left = self.cadence.confirm_attempts
+                self._confirm_delay = self.cadence.confirm_interval
+                return self._confirm_delay
+            await self._post_round(state)
+        else:
+            self._refresh(state)
+        return period
+
+    async def _post_finished(self, state: AuctionState) -> None:
+        stats = await summarize(self.recorder, state)
+        for sink in self.sinks:
+            self._post(sink, sink.renderer.render_finished(state, stats, self.tracker.clock.now()), Priority.FINISH)
+        self.finished_sent = True
+        self.persist()
+
+    async def finish(self) -> None:
+        if self.finished_sent or not self.posted:
+            return
+        try:
+            state = await self.tracker.fetch()
+        except Exception as e:
+            state = self.tracker.state
+            if state is None:
+                raise
+            logger.bind(slug=self.slug).error(f"Final fetch failed, finishing from the last known state: {e}")
+        await self._post_finished(state)
+        logger.bind(slug=self.slug).info(f"Auction {self.slug} left the catalogue; finish message queued")
+
+    def _push_quiet_left(self, state: AuctionState) -> float:
+        if not self.cadence.push_silence or not self.tracker.last_push_at:
+            return 0.0
+        left = self.cadence.push_silence - (time.monotonic() - self.tracker.last_push_at)
+        if state.timeout:
+            left = min(left, state.timeout * 0.9)
+        return left
+
+    def _refresh(self, state: AuctionState) -> None:
+        fp = state.fingerprint()
+        now = time.monotonic()
+        if fp == self.last_fingerprint and now - self.last_edit_at < self.cadence.stale_after:
+            self.edits_skipped += 1
+            EDITS.inc(1, "skipped")
+            return
+        for sink in self.sinks:
+            text = sink.renderer.render(state, self.tracker.clock.now())
+            if text != self.last_text.get(sink.name):
+                self._edit(sink, text)
+                self.edits_sent += 1
+        self.last_fingerprint = fp
+        self.last_edit_at = now
+        self.persist()
@@ -0,0 +1,183 @@
+import bisect
+import mmap
+import os
+import re
+import time
+from array import array
+from typing import Sequence
+from auction.models import AuctionState, order_levels
+
+SNAP_FIELDS = ("ts", "version", "round", "min_bid", "gifts_left", "level_start", "level_count")
+SNAP_WIDTH = len(SNAP_FIELDS)
+LEVEL_WIDTH = 2
+ITEM = array("q").itemsize
+
+_COL = {name: i for i, name in enumerate(SNAP_FIELDS)}
+
+
+def _map(path: str) -> tuple[mmap.mmap | None, memoryview]:
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    if size == 0:
+        return None, memoryview(array("q"))
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return mm, memoryview(mm).cast("B")[: size - size % ITEM].cast("q")
+
+
+class _Column(Sequence[int]):
+    def __init__(self, data: memoryview, start: int, stop: int, offset: int) -> None:
+        self.data = data
+        self.start = start
+        self.stop = stop
+        self.offset = offset
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, i: int) -> int:
+        return self.data[(self.start + i) * SNAP_WIDTH + self.offset]
+
+
+class Series:
+    def __init__(self, snaps: memoryview, levels: memoryview, start: int = 0, stop: int | None = None, keep: tuple = ()) -> None:
+        self.snaps = snaps
+        self.level_data = levels
+        self.start = start
+        self.stop = len(snaps) // SNAP_WIDTH if stop is None else stop
+        self._keep = keep
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def row(self, i: int) -> tuple[int, ...]:
+        base = (self.start + i) * SNAP_WIDTH
+        return tuple(self.snaps[base: base + SNAP_WIDTH])
+
+    def column(self, name: str) -> list[int]:
+        off = _COL[name]
+        return self.snaps[self.start * SNAP_WIDTH + off: self.stop * SNAP_WIDTH: SNAP_WIDTH].tolist()
+
+    def levels(self, i: int) -> memoryview:
+        base = (self.start + i) * SNAP_WIDTH
+        first = self.snaps[base + _COL["level_start"]]
+        count = self.snaps[base + _COL["level_count"]]
+        return self.level_data[first * LEVEL_WIDTH: (first + count) * LEVEL_WIDTH]
+
+    def amounts(self, i: int, limit: int | None = None) -> list[int]:
+        lv = self.levels(i)
+        stop = len(lv) if limit is None else min(len(lv), limit * LEVEL_WIDTH)
+        return lv[1:stop:LEVEL_WIDTH].tolist()
+
+    def between(self, t0: int, t1: int) -> "Series":
+        ts = _Column(self.snaps, self.start, self.stop, _COL["ts"])
+        lo = bisect.bisect_left(ts, t0)
+        hi = bisect.bisect_right(ts, t1)
+        return Series(self.snaps, self.level_data, self.start + lo, self.start + hi, self._keep)
+
+    def round_closes(self) -> dict[int, int]:
+        closes: dict[int, int] = {}
+        rounds = self.column("round")
+        for i, r in enumerate(rounds):
+            closes[r] = i
+        return closes
+
+
+def series_from_state(state: AuctionState) -> Series:
+    levels = state.bid_levels if state.ordered else order_levels(state.bid_levels)
+    flat = array("q")
+    for b in levels:
+        flat.append(b.pos)
+        flat.append(b.amount)
+    row = array("q", (0, state.version, state.current_round, state.min_bid_amount, state.gifts_remaining, 0, len(levels)))
+    return Series(memoryview(row), memoryview(flat))
+
+
+class AuctionHistory:
+    def __init__(self, root: str, slug: str) -> None:
+        self.dir = os.path.join(root, re.sub(r"[^A-Za-z0-9_-]", "_", slug))
+        os.makedirs(self.dir, exist_ok=True)
+        self.snap_path = os.path.join(self.dir, "snapshots.q")
+        self.level_path = os.path.join(self.dir, "levels.q")
+        self._snaps = open(self.snap_path, "ab")
+        self._levels = open(self.level_path, "ab")
+        self._trim(self._snaps, SNAP_WIDTH * ITEM)
+        self._trim(self._levels, LEVEL_WIDTH * ITEM)
+        self.count = self._snaps.tell() // (SNAP_WIDTH * ITEM)
+        self.level_count = self._levels.tell() // (LEVEL_WIDTH * ITEM)
+        self.last_version = self._last_version()
+
+    @staticmethod
+    def _trim(f, row: int) -> None:
+        size = f.seek(0, os.SEEK_END)
+        if size % row:
+            f.truncate(size - size % row)
+            f.seek(0, os.SEEK_END)
+
+    def _last_version(self) -> int:
+        if not self.count:
+            return 0
+        with open(self.snap_path, "rb") as f:
+            f.seek((self.count - 1) * SNAP_WIDTH * ITEM)
+            row = array("q")
+            row.fromfile(f, SNAP_WIDTH)
+        return row[_COL["version"]]
+
+    def append(self, state: AuctionState, ts: int | None = None) -> bool:
+        if state.version and state.version == self.last_version:
+            return False
+        levels = state.bid_levels if state.ordered else order_levels(state.bid_levels)
+        flat = array("q")
+        for b in levels:
+            flat.append(b.pos)
+            flat.append(b.amount)
+        row = array("q", (
+            int(ts if ts is not None else time.time()),
+            state.version,
+            state.current_round,
+            state.min_bid_amount,
+            state.gifts_remaining,
+            self.level_count,
+            len(levels),
+        ))
+        flat.tofile(self._levels)
+        self._levels.flush()
+        row.tofile(self._snaps)
+        self._snaps.flush()
+        self.level_count += len(levels)
+        self.count += 1
+        self.last_version = state.version
+        return True
+
+    def read(self) -> Series:
+        mm_s, snaps = _map(self.snap_path)
+        mm_l, levels = _map(self.level_path)
+        return Series(snaps, levels, keep=(mm_s, mm_l))
+
+    def close(self) -> None:
+        self._snaps.close()
+        self._levels.close()
+
+
+class HistoryRecorder:
+    def __init__(self, root: str = "history") -> None:
+        self.root = root
+        self.auctions: dict[str, AuctionHistory] = {}
+
+    def get(self, slug: str) -> AuctionHistory:
+        h = self.auctions.get(slug)
+        if h is None:
+            h = self.auctions[slug] = AuctionHistory(self.root, slug)
+        return h
+
+    def append(self, slug: str, state: AuctionState, ts: int | None = None) -> bool:
+        return self.get(slug).append(state, ts)
+
+    def read(self, slug: str) -> Series:
+        return self.get(slug).read()
+
+    def close(self, slug: str | None = None) -> None:
+        keys = [slug] if slug is not None else list(self.auctions)
+        for k in keys:
+            h = self.auctions.pop(k, None)
+            if h is not None:
+                h.close()
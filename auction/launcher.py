@@ -0,0 +1,24 @@
+import asyncio
+import sys
+from typing import Any, Callable, Coroutine
+from loguru import logger
+
+
+def loop_factory() -> Callable[[], asyncio.AbstractEventLoop] | None:
+    if sys.platform == "win32":
+        return None
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop.new_event_loop
+
+
+def launch(main: Callable[[], Coroutine[Any, Any, None]]) -> None:
+    factory = loop_factory()
+    logger.info(f"Event loop: {'uvloop' if factory is not None else 'asyncio'}")
+    try:
+        with asyncio.Runner(loop_factory=factory) as runner:
+            runner.run(main())
+    except KeyboardInterrupt:
+        pass
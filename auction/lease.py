@@ -0,0 +1,55 @@
+import sqlite3
+import threading
+import time
+from typing import Protocol
+
+
+class LeaseStore(Protocol):
+    def acquire(self, key: str, node: str, ttl: float) -> bool: ...
+
+    def renew(self, node: str, ttl: float) -> set[str]: ...
+
+    def release(self, key: str, node: str) -> None: ...
+
+    def holders(self) -> dict[str, str]: ...
+
+
+class SqliteLeases:
+    def __init__(self, path: str, timeout: float = 1.0) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            "key TEXT PRIMARY KEY, node TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def acquire(self, key: str, node: str, ttl: float) -> bool:
+        now = time.time()
+        with self.lock:
+            cur = self.db.execute(
+                "INSERT INTO leases (key, node, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET node = excluded.node, expires_at = excluded.expires_at "
+                "WHERE leases.node = excluded.node OR leases.expires_at <= ?",
+                (key, node, now + ttl, now),
+            )
+        return cur.rowcount > 0
+
+    def renew(self, node: str, ttl: float) -> set[str]:
+        with self.lock:
+            self.db.execute("UPDATE leases SET expires_at = ? WHERE node = ?", (time.time() + ttl, node))
+            return {r[0] for r in self.db.execute("SELECT key FROM leases WHERE node = ?", (node,))}
+
+    def release(self, key: str, node: str) -> None:
+        with self.lock:
+            self.db.execute("DELETE FROM leases WHERE key = ? AND node = ?", (key, node))
+
+    def holders(self) -> dict[str, str]:
+        with self.lock:
+            rows = self.db.execute("SELECT key, node FROM leases WHERE expires_at > ?", (time.time(),)).fetchall()
+        return {r[0]: r[1] for r in rows}
+
+    def close(self) -> None:
+        with self.lock:
+            self.db.close()
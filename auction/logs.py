@@ -0,0 +1,48 @@
+import json
+import os
+import sys
+from loguru import logger
+
+FORMAT = "| <magenta>{time:YYYY-MM-DD HH:mm:ss}</magenta> | <cyan><level>{level: <8}</level></cyan> | {message}"
+
+
+def _json_record(record: dict) -> None:
+    record["extra"]["json"] = json.dumps(
+        {
+            "ts": round(record["time"].timestamp(), 3),
+            "level": record["level"].name,
+            "slug": record["extra"].get("slug", ""),
+            "source": f"{record['name']}:{record['line']}",
+            "message": record["message"],
+        },
+        ensure_ascii=False,
+    )
+
+
+def setup_logging(name: str) -> None:
+    rotation = os.getenv("LOG_ROTATION") or "50 MB"
+    retention = os.getenv("LOG_RETENTION") or "14 days"
+    logger.remove()
+    logger.configure(extra={"slug": ""})
+    logger.add(sys.stdout, format=FORMAT, level="INFO", colorize=True, enqueue=True)
+    logger.add(
+        f"{name}.log",
+        format=FORMAT,
+        level="INFO",
+        colorize=False,
+        enqueue=True,
+        rotation=rotation,
+        retention=retention,
+        compression="gz",
+    )
+    if (os.getenv("LOG_JSON") or "").lower() in ("1", "true", "yes"):
+        logger.configure(patcher=_json_record)
+        logger.add(
+            f"{name}.jsonl",
+            format="{extra[json]}",
+            level="INFO",
+            enqueue=True,
+            rotation=rotation,
+            retention=retention,
+            compression="gz",
+        )
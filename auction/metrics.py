@@ -0,0 +1,146 @@
+import bisect
+import math
+from typing import Any, Callable, Iterator
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = tuple[str, ...]
+
+
+def _labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _num(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, doc: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.doc = doc
+        self.label_names = labels
+
+    def samples(self) -> Iterator[str]:
+        return iter(())
+
+    def expose(self) -> str:
+        head = f"# HELP {self.name} {self.doc}\n# TYPE {self.name} {self.kind}\n"
+        return head + "".join(f"{s}\n" for s in self.samples())
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, doc, labels)
+        self.values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def samples(self) -> Iterator[str]:
+        for labels, v in self.values.items():
+            yield f"{self.name}{_labels(self.label_names, labels)} {_num(v)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        self.values[labels] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(sorted(buckets))
+        self.counts: dict[LabelValues, list[int]] = {}
+        self.sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts = self.counts.get(labels)
+        if counts is None:
+            counts = self.counts[labels] = [0] * (len(self.buckets) + 1)
+            self.sums[labels] = 0.0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sums[labels] += value
+
+    def samples(self) -> Iterator[str]:
+        for labels, counts in self.counts.items():
+            total = 0
+            for bound, c in zip((*self.buckets, math.inf), counts):
+                total += c
+                le = f'le="{_num(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.label_names, labels, le)} {total}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {_num(self.sums[labels])}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {total}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def expose(self) -> str:
+        return "".join(m.expose() for m in self.metrics.values())
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY = Registry()
+
+RPC_SECONDS = REGISTRY.register(Histogram("auction_rpc_seconds", "Telegram call latency by method.", ("method",)))
+RPC_ERRORS = REGISTRY.register(Counter("auction_rpc_errors_total", "Telegram calls that raised, by method.", ("method",)))
+FLOOD_WAIT_SECONDS = REGISTRY.register(Counter("auction_flood_wait_seconds_total", "Seconds of flood wait imposed, by method.", ("method",)))
+EDITS = REGISTRY.register(Counter("auction_edits_total", "Routine message refreshes, by result.", ("result",)))
+POLL_LAG = REGISTRY.register(Histogram("auction_poll_lag_seconds", "Delay between a poll's scheduled and actual start."))
+ROUND_TRANSITION = REGISTRY.register(
+    Histogram("auction_round_transition_seconds", "Time from next_round_at to the new round being posted.")
+)
+ACTIVE_AUCTIONS = REGISTRY.register(Gauge("auction_active_auctions", "Auctions currently being followed."))
+SESSION_AUCTIONS = REGISTRY.register(Gauge("auction_session_auctions", "Auctions assigned to each pooled session.", ("session",)))
+SESSION_CALLS = REGISTRY.register(Counter("auction_session_calls_total", "Calls routed through each pooled session.", ("session",)))
+SESSION_AVAILABLE = REGISTRY.register(
+    Gauge("auction_session_available", "1 while a pooled session accepts calls, 0 while it is marked down.", ("pool", "session"))
+)
+SESSION_FAILURES = REGISTRY.register(
+    Gauge("auction_session_failures", "Flood waits and disconnects per pooled session since start.", ("pool", "session", "kind"))
+)
+RATELIMIT_FILL = REGISTRY.register(Gauge("auction_ratelimit_fill", "Token bucket fill from 0 to 1, by limiter and bucket.", ("limiter", "bucket")))
+SCHEDULED_POLLS = REGISTRY.register(Gauge("auction_scheduled_polls", "Polls waiting in the scheduler."))
+INFLIGHT_POLLS = REGISTRY.register(Gauge("auction_inflight_polls", "Polls currently running."))
+PUBLISH_QUEUE = REGISTRY.register(Gauge("auction_publish_queue", "Messages waiting per destination.", ("destination",)))
+PUBLISHED = REGISTRY.register(
+    Gauge("auction_published_messages", "Messages handled per destination since start, by result.", ("destination", "result"))
+)
+
+
+async def serve_metrics(
+    port: int, host: str = "127.0.0.1", registry: Registry = REGISTRY, collect: Callable[[], None] | None = None
+) -> Any:
+    from aiohttp import web
+
+    async def handle(request: web.Request) -> web.Response:
+        if collect is not None:
+            collect()
+        return web.Response(body=registry.expose().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -0,0 +1,134 @@
+import hashlib
+import heapq
+from dataclasses import dataclass, replace
+from typing import Any
+
+
+def auction_key(gift: Any) -> str:
+    return gift.auction_slug if getattr(gift, "auction_slug", None) else str(gift.id)
+
+
+def _int(v: Any) -> int:
+    try:
+        return int(v or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+@dataclass(slots=True, frozen=True)
+class BidLevel:
+    pos: int
+    amount: int
+    date: int = 0
+
+    @classmethod
+    def from_tl(cls, level: Any) -> "BidLevel":
+        return cls(
+            pos=_int(getattr(level, "pos", 0)),
+            amount=_int(getattr(level, "amount", 0)),
+            date=_int(getattr(level, "date", 0)),
+        )
+
+
+def _pos(level: BidLevel) -> int:
+    return level.pos
+
+
+def order_levels(levels: tuple[BidLevel, ...]) -> tuple[BidLevel, ...]:
+    prev = None
+    for b in levels:
+        if prev is not None and b.pos < prev:
+            return tuple(sorted(levels, key=_pos))
+        prev = b.pos
+    return levels
+
+
+@dataclass(slots=True, frozen=True)
+class GiftInfo:
+    id: int
+    slug: str
+    title: str
+    availability_total: int
+    availability_remains: int
+    gifts_per_round: int
+
+    @classmethod
+    def from_tl(cls, gift: Any) -> "GiftInfo":
+        return cls(
+            id=_int(getattr(gift, "id", 0)),
+            slug=auction_key(gift),
+            title=getattr(gift, "title", None) or "Auction",
+            availability_total=_int(getattr(gift, "availability_total", 0)),
+            availability_remains=_int(getattr(gift, "availability_remains", 0)),
+            gifts_per_round=_int(getattr(gift, "gifts_per_round", 0)),
+        )
+
+
+_STATE_FIELDS = (
+    "version",
+    "start_date",
+    "end_date",
+    "next_round_at",
+    "current_round",
+    "total_rounds",
+    "gifts_left",
+    "min_bid_amount",
+    "average_price",
+)
+
+
+@dataclass(slots=True, frozen=True)
+class AuctionState:
+    gift: GiftInfo
+    version: int = 0
+    start_date: int = 0
+    end_date: int = 0
+    next_round_at: int = 0
+    current_round: int = 0
+    total_rounds: int = 0
+    gifts_left: int = 0
+    min_bid_amount: int = 0
+    average_price: int = 0
+    bid_levels: tuple[BidLevel, ...] = ()
+    timeout: int = 0
+    ordered: bool = False
+
+    @property
+    def gifts_remaining(self) -> int:
+        return self.gifts_left or self.gift.availability_remains
+
+    def top_bids(self) -> list[BidLevel]:
+        levels = self.bid_levels
+        n = max(1, self.gift.gifts_per_round or len(levels))
+        if self.ordered:
+            return list(levels[:n])
+        if n * 4 < len(levels):
+            return heapq.nsmallest(n, levels, key=_pos)
+        return sorted(levels, key=_pos)[:n]
+
+    def fingerprint(self) -> str:
+        key = (
+            self.gift,
+            self.current_round,
+            self.total_rounds,
+            self.gifts_remaining,
+            self.min_bid_amount,
+            self.next_round_at,
+            self.end_date,
+            tuple((b.pos, b.amount) for b in self.top_bids()),
+        )
+        return hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest()
+
+    @classmethod
+    def from_tl(cls, st: Any, gift: GiftInfo, previous: "AuctionState | None" = None) -> "AuctionState":
+        base = previous if previous is not None else cls(gift=gift)
+        fields: dict[str, Any] = {"gift": gift}
+        for name in _STATE_FIELDS:
+            v = getattr(st, name, None)
+            if v is not None:
+                fields[name] = _int(v)
+        levels = getattr(st, "bid_levels", None)
+        if levels is not None:
+            fields["bid_levels"] = order_levels(tuple(BidLevel.from_tl(b) for b in levels))
+            fields["ordered"] = True
+        return replace(base, **fields)
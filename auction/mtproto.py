@@ -0,0 +1,52 @@
+from loguru import logger
+from pyrogram import Client, enums
+from pyrogram.errors import FloodWait, MessageNotModified, RPCError
+from auction.flow import Sink
+from auction.pool import ChatMember, PooledChat, pooled_limiter
+from auction.publisher import ChatUnavailable, Publisher
+from auction.ratelimit import RateLimiter
+from auction.render import MTPROTO, Renderer
+from auction.store import TrackerStore
+
+
+def create_client(api_id: int, api_hash: str, workdir: str, no_updates: bool = True, name: str = "account") -> Client:
+    return Client(
+        name,
+        api_id=api_id,
+        api_hash=api_hash,
+        workdir=workdir,
+        in_memory=False,
+        no_updates=no_updates,
+    )
+
+
+class MtprotoChat:
+    def __init__(self, app: Client) -> None:
+        self.app = app
+
+    async def send(self, chat: int | str, text: str, key: str = "") -> int:
+        try:
+            msg = await self.app.send_message(chat_id=chat, text=text, parse_mode=enums.ParseMode.HTML)
+        except RPCError as e:
+            emsg = str(e).lower()
+            if "peer" in emsg or "chat not found" in emsg or "peer_id_invalid" in emsg:
+                raise ChatUnavailable(str(e)) from e
+            raise
+        return msg.id
+
+    async def edit(self, chat: int | str, message_id: int, text: str, key: str = "") -> None:
+        try:
+            await self.app.edit_message_text(chat_id=chat, message_id=message_id, text=text, parse_mode=enums.ParseMode.HTML)
+        except MessageNotModified:
+            pass
+        except FloodWait:
+            raise
+        except RPCError as e:
+            logger.error(f"Edit failed: {e}")
+
+
+def userbot_sink(apps: list[Client], chats: list[int | str], limiter: RateLimiter, store: TrackerStore | None = None) -> Sink:
+    if len(apps) == 1:
+        return Sink("userbot", Renderer(MTPROTO), Publisher.for_chats("userbot", chats, MtprotoChat(apps[0]), limiter, store))
+    pool = PooledChat([ChatMember(a.name, MtprotoChat(a)) for a in apps])
+    return Sink("userbot", Renderer(MTPROTO), Publisher.for_chats("userbot", chats, pool, pooled_limiter(len(apps)), store))
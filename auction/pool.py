@@ -0,0 +1,197 @@
+import bisect
+import hashlib
+import time
+from typing import Any, Awaitable, Callable, TypeVar
+from loguru import logger
+from auction.metrics import SESSION_AUCTIONS, SESSION_CALLS
+from auction.ratelimit import RateLimiter, parse_flood_wait
+from auction.transport import ChatTransport, RpcTransport
+
+T = TypeVar("T")
+
+HANDLE_BITS = 8
+DISCONNECT_ERRORS = (ConnectionError, OSError, TimeoutError)
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    def __init__(self, nodes: list[str], replicas: int = 64) -> None:
+        points = sorted((_hash(f"{node}#{i}"), node) for node in nodes for i in range(replicas))
+        self._hashes = [h for h, _ in points]
+        self._nodes = [n for _, n in points]
+
+    def lookup(self, key: str, exclude: set[str] | frozenset[str] = frozenset()) -> str | None:
+        if not self._nodes:
+            return None
+        start = bisect.bisect(self._hashes, _hash(key)) % len(self._nodes)
+        for i in range(len(self._nodes)):
+            node = self._nodes[(start + i) % len(self._nodes)]
+            if node not in exclude:
+                return node
+        return None
+
+
+class Member:
+    def __init__(self, name: str, limiter: RateLimiter | None = None, reconnect_after: float = 30.0) -> None:
+        self.name = name
+        self.limiter = limiter if limiter is not None else RateLimiter(retries=0)
+        self.reconnect_after = reconnect_after
+        self.down_until = 0.0
+        self.calls = 0
+        self.flood_waits = 0
+        self.disconnects = 0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def mark_down(self, seconds: float) -> None:
+        self.down_until = max(self.down_until, time.monotonic() + seconds)
+
+    def failed(self, e: BaseException) -> bool:
+        wait = parse_flood_wait(e)
+        if wait is not None:
+            self.flood_waits += 1
+            self.mark_down(wait)
+            logger.error(f"Session {self.name} is in flood wait for {wait}s; moving its auctions")
+            return True
+        if isinstance(e, DISCONNECT_ERRORS):
+            self.disconnects += 1
+            self.mark_down(self.reconnect_after)
+            logger.error(f"Session {self.name} disconnected ({e}); moving its auctions")
+            return True
+        return False
+
+
+class _Pool:
+    def __init__(self, members: list[Member]) -> None:
+        self.members = {m.name: m for m in members}
+        self.ring = HashRing(list(self.members))
+        self.owners: dict[str, str] = {}
+
+    def owner(self, key: str, exclude: set[str] | None = None) -> Member:
+        down = {n for n, m in self.members.items() if not m.available} | (exclude or set())
+        name = self.ring.lookup(key, down) or self.ring.lookup(key)
+        if self.owners.get(key) != name:
+            previous = self.owners.get(key)
+            if previous is not None:
+                logger.bind(slug=key).info(f"Auction {key} moved from {previous} to {name}")
+            self.owners[key] = name
+            self._report()
+        return self.members[name]
+
+    def release(self, key: str) -> None:
+        if self.owners.pop(key, None) is not None:
+            self._report()
+
+    def _report(self) -> None:
+        load = self.load()
+        for name, count in load.items():
+            SESSION_AUCTIONS.set(count, name)
+
+    def load(self) -> dict[str, int]:
+        load = {name: 0 for name in self.members}
+        for name in self.owners.values():
+            load[name] += 1
+        return load
+
+    async def _routed(self, key: str, call: Callable[[Member], Awaitable[T]]) -> T:
+        tried: set[str] = set()
+        while True:
+            member = self.owner(key, tried)
+            member.calls += 1
+            SESSION_CALLS.inc(1, member.name)
+            try:
+                return await call(member)
+            except Exception as e:
+                if not member.failed(e) or len(tried) + 1 >= len(self.members):
+                    raise
+                tried.add(member.name)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        load = self.load()
+        return {
+            name: {
+                "auctions": load[name],
+                "calls": m.calls,
+                "flood_waits": m.flood_waits,
+                "disconnects": m.disconnects,
+                "available": m.available,
+            }
+            for name, m in self.members.items()
+        }
+
+
+class RpcMember(Member):
+    def __init__(self, name: str, app: RpcTransport, limiter: RateLimiter | None = None, reconnect_after: float = 30.0) -> None:
+        super().__init__(name, limiter, reconnect_after)
+        self.app = app
+
+
+class SessionPool(_Pool):
+    def __init__(self, members: list[RpcMember]) -> None:
+        super().__init__(members)
+
+    def shard(self, key: str) -> "Shard":
+        return Shard(self, key)
+
+    async def call(self, key: str, query: Any) -> Any:
+        return await self._routed(key, lambda m: m.limiter.invoke(m.app, query))
+
+    async def invoke(self, query: Any) -> Any:
+        return await self.call(f":{type(query).__name__}", query)
+
+
+class Shard:
+    def __init__(self, pool: SessionPool, key: str) -> None:
+        self.pool = pool
+        self.key = key
+
+    @property
+    def server_time(self) -> float | None:
+        return getattr(self.pool.owner(self.key).app, "server_time", None)
+
+    async def invoke(self, query: Any) -> Any:
+        return await self.pool.call(self.key, query)
+
+
+class ChatMember(Member):
+    def __init__(self, name: str, chat: ChatTransport, limiter: RateLimiter | None = None, reconnect_after: float = 30.0) -> None:
+        super().__init__(name, limiter, reconnect_after)
+        self.chat = chat
+
+
+def pooled_limiter(members: int, chat_limit: tuple[float, float] = (20 / 60, 20), flood_scope: str = "method") -> RateLimiter:
+    return RateLimiter(
+        limits={},
+        default=(1e6, 1e6),
+        chat_limit=(chat_limit[0] * members, chat_limit[1] * members),
+        flood_scope=flood_scope,
+        record=False,
+    )
+
+
+class PooledChat(_Pool):
+    def __init__(self, members: list[ChatMember]) -> None:
+        super().__init__(members)
+        self.order = sorted(self.members)
+
+    async def send(self, chat: Any, text: str, key: str = "") -> int:
+        async def post(m: ChatMember) -> int:
+            msg_id = await m.limiter.call("send_message", lambda: m.chat.send(chat, text, key), chat=chat)
+            return (msg_id << HANDLE_BITS) | self.order.index(m.name)
+
+        return await self._routed(key, post)
+
+    async def edit(self, chat: Any, message_id: int, text: str, key: str = "") -> None:
+        member = self.members[self.order[message_id & ((1 << HANDLE_BITS) - 1)]]
+        member.calls += 1
+        SESSION_CALLS.inc(1, member.name)
+        try:
+            await member.limiter.call("edit_message_text", lambda: member.chat.edit(chat, message_id >> HANDLE_BITS, text, key), chat=chat)
+        except Exception as e:
+            member.failed(e)
+            raise
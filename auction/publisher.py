@@ -0,0 +1,302 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any
+from loguru import logger
+from auction.metrics import EDITS
+from auction.ratelimit import RateLimiter
+from auction.store import TrackerStore
+from auction.transport import ChatTransport
+
+FALLBACK_CHAT = "@AuctionStateTG"
+
+
+def resolve_target_chat(channel_id: str | None, username_fallback: str | None = None) -> int | str | None:
+    if not channel_id:
+        return username_fallback
+    s = str(channel_id).strip()
+    if s.startswith("@"):
+        return s
+    try:
+        if s.startswith("-100"):
+            return int(s)
+        n = int(s)
+        if n > 0:
+            return int(f"-100{s}")
+        return n
+    except Exception:
+        return username_fallback or s
+
+
+def target_chats(channel_ids: str | None) -> list[int | str]:
+    chats = [resolve_target_chat(c, FALLBACK_CHAT) for c in (channel_ids or "").split(",") if c.strip()]
+    return chats or [FALLBACK_CHAT]
+
+
+class ChatUnavailable(Exception):
+    pass
+
+
+class Priority(IntEnum):
+    FINISH = 0
+    ROUND = 1
+    ROUND_ENDED = 2
+    REFRESH = 3
+
+
+@dataclass(slots=True)
+class Outbound:
+    kind: str
+    key: str
+    text: str
+    priority: Priority = Priority.REFRESH
+    gen: int = 0
+    deadline: float = 0.0
+    dropped: bool = False
+
+
+class Destination:
+    def __init__(
+        self,
+        chat: Any,
+        transport: ChatTransport,
+        limiter: RateLimiter,
+        store: TrackerStore | None = None,
+        fallback: Any = None,
+        maxsize: int = 1000,
+        name: str | None = None,
+        refresh_ttl: float = 30.0,
+    ) -> None:
+        self.name = name or str(chat)
+        self.chat = chat
+        self.transport = transport
+        self.limiter = limiter
+        self.store = store
+        self.fallback = fallback
+        self.maxsize = maxsize
+        self.refresh_ttl = refresh_ttl
+        self.msg_ids: dict[str, int] = store.load_messages(self.name) if store is not None else {}
+        self.generation: dict[str, int] = {}
+        self._gen_ids: dict[str, dict[int, int]] = {k: {0: v} for k, v in self.msg_ids.items()}
+        self._heap: list[tuple[int, int, str]] = []
+        self._queues: dict[str, deque[Outbound]] = {}
+        self._rank: dict[str, tuple[int, int]] = {}
+        self._size = 0
+        self._seq = itertools.count()
+        self._ready = asyncio.Event()
+        self._refresh: dict[str, Outbound] = {}
+        self._forgotten: set[str] = set()
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self.collapsed = 0
+        self.superseded = 0
+        self.expired = 0
+
+    @property
+    def pending(self) -> int:
+        return self._size
+
+    def forget(self, key: str) -> None:
+        self.msg_ids.pop(key, None)
+        self.generation.pop(key, None)
+        self._gen_ids.pop(key, None)
+        self._forgotten.add(key)
+
+    def drop(self, key: str) -> None:
+        self._refresh.pop(key, None)
+        for item in self._queues.get(key, ()):
+            if not item.dropped:
+                item.dropped = True
+                self.superseded += 1
+
+    def adopt(self, key: str, msg_id: int | None) -> None:
+        self.forget(key)
+        self._forgotten.discard(key)
+        if msg_id is not None:
+            self.msg_ids[key] = msg_id
+            self._gen_ids[key] = {0: msg_id}
+
+    def submit(self, item: Outbound) -> None:
+        if self._size >= self.maxsize:
+            self.dropped += 1
+            logger.bind(slug=item.key).error(f"Publish queue for {self.name} is full; dropping {item.kind} for {item.key}")
+            return
+        self._forgotten.discard(item.key)
+        if item.kind == "post":
+            item.gen = self.generation[item.key] = self.generation.get(item.key, 0) + 1
+        else:
+            item.gen = self.generation.get(item.key, 0)
+        queued = self._refresh.pop(item.key, None)
+        if queued is not None:
+            if item.priority == Priority.REFRESH and queued.gen == item.gen:
+                queued.text = item.text
+                queued.deadline = time.monotonic() + self.refresh_ttl
+                self._refresh[item.key] = queued
+                self.collapsed += 1
+                return
+            queued.dropped = True
+            self.superseded += 1
+        if item.priority == Priority.REFRESH:
+            item.deadline = time.monotonic() + self.refresh_ttl
+            self._refresh[item.key] = item
+        queue = self._queues.setdefault(item.key, deque())
+        queue.append(item)
+        self._size += 1
+        rank = self._rank.get(item.key)
+        if rank is None or item.priority < rank[0]:
+            self._enqueue(item.key, item.priority)
+        self._ready.set()
+
+    def _enqueue(self, key: str, priority: int) -> None:
+        rank = self._rank[key] = (priority, next(self._seq))
+        heapq.heappush(self._heap, (*rank, key))
+
+    async def _next(self) -> Outbound:
+        while True:
+            while not self._heap:
+                self._ready.clear()
+                await self._ready.wait()
+            priority, seq, key = heapq.heappop(self._heap)
+            if self._rank.get(key) != (priority, seq):
+                continue
+            queue = self._queues[key]
+            item = queue.popleft()
+            self._size -= 1
+            if queue:
+                self._enqueue(key, min(i.priority for i in queue))
+            else:
+                del self._queues[key]
+                del self._rank[key]
+            if item.dropped:
+                continue
+            if item.priority == Priority.REFRESH:
+                if self._refresh.get(item.key) is item:
+                    del self._refresh[item.key]
+                if time.monotonic() > item.deadline:
+                    self.expired += 1
+                    continue
+            return item
+
+    async def _post(self, item: Outbound) -> None:
+        msg_id = await self.limiter.call("send_message", lambda: self.transport.send(self.chat, item.text, item.key), chat=self.chat)
+        if item.key in self._forgotten:
+            return
+        self.msg_ids[item.key] = msg_id
+        ids = self._gen_ids.setdefault(item.key, {})
+        ids[item.gen] = msg_id
+        for gen in [g for g in ids if g < item.gen - 1]:
+            del ids[gen]
+        if self.store is not None:
+            self.store.save_message(self.name, item.key, msg_id)
+
+    async def _deliver(self, item: Outbound) -> None:
+        if item.kind == "edit" and item.key in self._forgotten:
+            self.superseded += 1
+            return
+        ids = self._gen_ids.get(item.key)
+        msg_id = ids.get(item.gen) if ids else None
+        if item.kind == "post" or not ids or (msg_id is None and item.gen > max(ids)):
+            await self._post(item)
+        elif msg_id is None:
+            self.superseded += 1
+            return
+        else:
+            await self.limiter.call("edit_message_text", lambda: self.transport.edit(self.chat, msg_id, item.text, item.key), chat=self.chat)
+            if item.priority == Priority.REFRESH:
+                EDITS.inc(1, "sent")
+        self.sent += 1
+
+    async def run(self) -> None:
+        while True:
+            item = await self._next()
+            try:
+                try:
+                    await self._deliver(item)
+                except ChatUnavailable:
+                    if self.fallback is None or self.chat == self.fallback:
+                        raise
+                    logger.error(f"Chat {self.chat} not found; publishing to {self.fallback} instead")
+                    self.chat = self.fallback
+                    await self._post(item)
+                    self.sent += 1
+            except Exception as e:
+                self.failed += 1
+                logger.bind(slug=item.key).error(f"Publish to {self.name} failed: {e}")
+
+
+class Publisher:
+    def __init__(self, destinations: list[Destination]) -> None:
+        self.destinations = destinations
+        self._tasks: list[asyncio.Task] = []
+
+    def post(self, key: str, text: str, priority: Priority = Priority.ROUND) -> None:
+        for d in self.destinations:
+            d.submit(Outbound("post", key, text, priority))
+
+    def edit(self, key: str, text: str, priority: Priority = Priority.REFRESH) -> None:
+        for d in self.destinations:
+            d.submit(Outbound("edit", key, text, priority))
+
+    def forget(self, key: str) -> None:
+        for d in self.destinations:
+            d.forget(key)
+
+    def drop(self, key: str) -> None:
+        for d in self.destinations:
+            d.drop(key)
+
+    def adopt(self, key: str, msg_ids: dict[str, int]) -> None:
+        for d in self.destinations:
+            d.adopt(key, msg_ids.get(d.name))
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(d.run()) for d in self.destinations]
+
+    async def close(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @classmethod
+    def for_chats(
+        cls,
+        flavour: str,
+        chats: list[Any],
+        transport: ChatTransport,
+        limiter: RateLimiter,
+        store: TrackerStore | None = None,
+    ) -> "Publisher":
+        return cls(
+            [
+                Destination(
+                    chat,
+                    transport,
+                    limiter,
+                    store,
+                    fallback=FALLBACK_CHAT if i == 0 else None,
+                    name=f"{flavour}:{chat}",
+                )
+                for i, chat in enumerate(chats)
+            ]
+        )
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {
+            d.name: {
+                "queued": d.pending,
+                "sent": d.sent,
+                "collapsed": d.collapsed,
+                "superseded": d.superseded,
+                "expired": d.expired,
+                "dropped": d.dropped,
+                "failed": d.failed,
+            }
+            for d in self.destinations
+        }
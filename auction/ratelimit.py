@@ -0,0 +1,149 @@
+import asyncio
+import re
+import time
+from typing import Any, Awaitable, Callable, TypeVar
+from loguru import logger
+from auction.metrics import FLOOD_WAIT_SECONDS, RPC_ERRORS, RPC_SECONDS
+
+T = TypeVar("T")
+
+_FLOOD_RE = re.compile(r"FLOOD_WAIT_?(\d+)|wait of (\d+) seconds|retry after (\d+)", re.IGNORECASE)
+
+
+def parse_flood_wait(exc: BaseException) -> int | None:
+    name = type(exc).__name__
+    emsg = str(exc)
+    if "FloodWait" not in name and "RetryAfter" not in name and "FLOOD_WAIT" not in emsg.upper():
+        return None
+    for attr in ("value", "retry_after"):
+        v = getattr(exc, attr, None)
+        if isinstance(v, int) and not isinstance(v, bool):
+            return v
+    m = _FLOOD_RE.search(emsg)
+    if m:
+        return int(next(g for g in m.groups() if g))
+    return 60
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.blocked_until = 0.0
+        self._stamp = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    @property
+    def fill(self) -> float:
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return 0.0
+        self._refill(now)
+        return self.tokens / self.capacity
+
+    def penalize(self, seconds: float) -> None:
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = min(self.tokens, 1.0)
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+DEFAULT_LIMITS: dict[str, tuple[float, float]] = {
+    "GetStarGiftAuctionState": (5.0, 10.0),
+    "GetStarGifts": (1.0, 2.0),
+    "send_message": (1.0, 5.0),
+    "edit_message_text": (1.0, 5.0),
+}
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        limits: dict[str, tuple[float, float]] | None = None,
+        default: tuple[float, float] = (1.0, 5.0),
+        chat_limit: tuple[float, float] = (20 / 60, 20.0),
+        retries: int = 1,
+        flood_scope: str = "method",
+        record: bool = True,
+    ) -> None:
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self.default = default
+        self.chat_limit = chat_limit
+        self.retries = retries
+        self.flood_scope = flood_scope
+        self.record = record
+        self.methods: dict[str, TokenBucket] = {}
+        self.chats: dict[Any, TokenBucket] = {}
+        self.flood_waits = 0
+        self.flood_wait_seconds = 0
+
+    def method_bucket(self, method: str) -> TokenBucket:
+        bucket = self.methods.get(method)
+        if bucket is None:
+            bucket = self.methods[method] = TokenBucket(*self.limits.get(method, self.default))
+        return bucket
+
+    def chat_bucket(self, chat: Any) -> TokenBucket:
+        bucket = self.chats.get(chat)
+        if bucket is None:
+            bucket = self.chats[chat] = TokenBucket(*self.chat_limit)
+        return bucket
+
+    def stats(self) -> dict[str, float]:
+        data = {f"method:{k}": round(b.fill, 3) for k, b in self.methods.items()}
+        data.update({f"chat:{k}": round(b.fill, 3) for k, b in self.chats.items()})
+        return data
+
+    async def call(self, method: str, fn: Callable[[], Awaitable[T]], chat: Any = None) -> T:
+        attempt = 0
+        while True:
+            bucket = self.method_bucket(method)
+            chat_bucket = self.chat_bucket(chat) if chat is not None else None
+            await bucket.acquire()
+            if chat_bucket is not None:
+                await chat_bucket.acquire()
+            t0 = time.perf_counter()
+            try:
+                return await fn()
+            except Exception as e:
+                wait = parse_flood_wait(e)
+                if wait is None:
+                    if self.record:
+                        RPC_ERRORS.inc(1, method)
+                    raise
+                self.flood_waits += 1
+                self.flood_wait_seconds += wait
+                if self.record:
+                    FLOOD_WAIT_SECONDS.inc(wait, method)
+                if chat_bucket is not None:
+                    chat_bucket.penalize(wait + 1)
+                if chat_bucket is None or self.flood_scope == "method":
+                    bucket.penalize(wait + 1)
+                logger.error(f"Flood wait on {method}: pausing for {wait}s")
+                if attempt >= self.retries:
+                    raise
+                attempt += 1
+            finally:
+                if self.record:
+                    RPC_SECONDS.observe(time.perf_counter() - t0, method)
+
+    async def invoke(self, app: Any, query: Any) -> Any:
+        return await self.call(type(query).__name__, lambda: app.invoke(query))
@@ -0,0 +1,258 @@
+import functools
+import html
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from auction.models import AuctionState
+from auction.stats import AuctionStats
+
+
+def html_escape(text: str) -> str:
+    return html.escape(str(text))
+
+
+def fmt_ts(ts: int) -> str:
+    dt = datetime.fromtimestamp(ts, tz=timezone.utc)
+    return dt.strftime("%Y-%m-%d %H:%M:%S UTC")
+
+
+@functools.lru_cache(maxsize=8192)
+def fmt_usd(stars: int | float) -> str:
+    usd = float(stars) * 0.015
+    s = f"{usd:.2f}".rstrip("0").rstrip(".")
+    return f"${s}"
+
+
+def fmt_delta(seconds: int) -> str:
+    seconds = max(0, int(seconds))
+    h = seconds // 3600
+    m = (seconds % 3600) // 60
+    s = seconds % 60
+    parts: list[str] = []
+    if h:
+        parts.append(f"{h}h")
+    if m or h:
+        parts.append(f"{m}m")
+    parts.append(f"{s}s")
+    return " ".join(parts)
+
+
+def fmt_dt(ts: int) -> str:
+    try:
+        dt = datetime.fromtimestamp(int(ts), tz=timezone.utc)
+        return dt.strftime("%b %d, %Y, %H:%M UTC")
+    except Exception:
+        return ""
+
+
+def fmt_duration(seconds: int) -> str:
+    seconds = max(0, int(seconds))
+    d = seconds // 86400
+    h = (seconds % 86400) // 3600
+    m = (seconds % 3600) // 60
+    parts = []
+    if d:
+        parts.append(f"{d} day" + ("s" if d != 1 else ""))
+    if h:
+        parts.append(f"{h} hour" + ("s" if h != 1 else ""))
+    parts.append(f"{m} minute" + ("s" if m != 1 else ""))
+    if len(parts) > 1:
+        return ", ".join(parts[:-1]) + " and " + parts[-1]
+    return parts[0]
+
+
+def fmt_stars(n: float) -> str:
+    try:
+        iv = int(round(float(n)))
+    except Exception:
+        iv = 0
+    return f"{iv:,}".replace(",", " ")
+
+
+@dataclass(slots=True, frozen=True)
+class Flavour:
+    name: str
+    hammer: str
+    clock: str
+    rounds: str
+    gifts: str
+    up: str
+    crown: str
+    star: str
+    top_title: str
+    footer: tuple[str, ...]
+
+
+MTPROTO = Flavour(
+    name="mtproto",
+    hammer='<emoji id="5411180428092533606">🔨</emoji>',
+    clock='<emoji id="5409044257388390754">🕓</emoji>',
+    rounds='<emoji id="5424766281528147222">🎁</emoji>',
+    gifts='<emoji id="5411480216809792207">🎁</emoji>',
+    up='<emoji id="5409128576186347318">⬆️</emoji>',
+    crown='<emoji id="5411258570727517292">👑</emoji>',
+    star='<emoji id="5472092560522511055">⭐️</emoji>',
+    top_title="<b>Top</b> {top_n} Bids:",
+    footer=("<b>Made By @Th3ryks</b>",),
+)
+
+BOT_API = Flavour(
+    name="botapi",
+    hammer=chr(0x1F528),
+    clock=chr(0x1F553),
+    rounds=chr(0x1F522),
+    gifts=chr(0x1F381),
+    up="⬆️",
+    crown=chr(0x1F451),
+    star="⭐️",
+    top_title="<b>Top {top_n} Bids:</b>",
+    footer=("", "<b>Made By @Th3ryks</b>"),
+)
+
+PLAIN_STAR = "⭐️"
+
+LIVE_TEMPLATE = (
+    "{hammer} {header}",
+    "",
+    "{clock} <b>Next Round In:</b> {next_in}",
+    "{rounds} <b>Total Rounds:</b> {current_round}/{total_rounds}",
+    "",
+    "{gifts} <b>Gifts Left:</b> {gifts_left}/{availability_total}",
+    "{up} <b>Min Bid:</b> {min_bid} {star} ≈ {min_bid_usd}",
+    "",
+    "{crown} {top_title}",
+    "<blockquote expandable>{bids}</blockquote>",
+    "{footer}",
+    "{clock} <b>Last Update:</b> {updated}",
+)
+
+FINISHED_TEMPLATE = (
+    "{hammer} {header} auction has <b>finished</b>!",
+    "{started}",
+    "{ended}",
+    "",
+    "<b>Average gift price:</b> {average} {plain_star}",
+    "<b>Median gift price:</b> {median} {plain_star}",
+    "<b>Price range (P10–P90):</b> {p10} – {p90} {plain_star}",
+    "<b>Bid dispersion:</b> ±{dispersion} {plain_star}",
+    "<b>Total volume:</b> {volume} {plain_star}",
+    "<b>Auction lasted:</b> {lasted}",
+    "{rounds_block}",
+    "",
+    "Done By @Th3ryks",
+    "{clock} <b>Last Update:</b> {updated}",
+)
+
+COUNTDOWN_LINE = LIVE_TEMPLATE.index("{clock} <b>Next Round In:</b> {next_in}")
+
+
+_FIELD = re.compile(r"\{(\w+)\}")
+
+
+class Template:
+    def __init__(self, lines: tuple[str, ...], static: dict[str, str]) -> None:
+        source = "\n".join(lines)
+        while True:
+            folded = _FIELD.sub(lambda m: static.get(m.group(1), m.group(0)), source)
+            if folded == source:
+                break
+            source = folded
+        self.parts = _FIELD.split(source)
+        self.fields = self.parts[1::2]
+
+    def render(self, values: dict[str, str]) -> str:
+        parts = self.parts.copy()
+        parts[1::2] = [values[f] for f in self.fields]
+        return "".join(parts)
+
+
+class Renderer:
+    def __init__(self, flavour: Flavour) -> None:
+        self.flavour = flavour
+        static = {
+            "hammer": flavour.hammer,
+            "clock": flavour.clock,
+            "rounds": flavour.rounds,
+            "gifts": flavour.gifts,
+            "up": flavour.up,
+            "crown": flavour.crown,
+            "star": flavour.star,
+            "plain_star": PLAIN_STAR,
+            "top_title": flavour.top_title,
+            "footer": "\n".join(flavour.footer),
+        }
+        self.live = Template(LIVE_TEMPLATE, static)
+        self.finished = Template(FINISHED_TEMPLATE, static)
+        self.ended_line = f"{flavour.clock} Round Ended"
+        self._headers: dict[tuple[str, str], str] = {}
+        self.bid_row = functools.lru_cache(maxsize=8192)(self._bid_row)
+        self.renders = 0
+        self.render_seconds = 0.0
+
+    def header(self, slug: str, title: str) -> str:
+        key = (slug, title)
+        h = self._headers.get(key)
+        if h is None:
+            slug_clean = str(slug or "").replace("`", "").strip()
+            h = self._headers[key] = f"<a href=\"https://t.me/auction/{html_escape(slug_clean)}\"><b>{html_escape(title)}</b></a>"
+        return h
+
+    def _bid_row(self, pos: int, amount: int) -> str:
+        return f"{pos}. {amount} {self.flavour.star} ≈ {fmt_usd(amount)}"
+
+    def render(self, state: AuctionState, now: float | None = None) -> str:
+        t0 = time.perf_counter()
+        gift = state.gift
+        bids = state.top_bids()
+        bid_row = self.bid_row
+        ts = time.time() if now is None else now
+        remain_sec = (state.next_round_at - int(ts)) if state.next_round_at else 0
+        text = self.live.render({
+            "header": self.header(gift.slug, gift.title),
+            "next_in": fmt_delta(remain_sec),
+            "current_round": str(state.current_round),
+            "total_rounds": str(state.total_rounds),
+            "gifts_left": str(state.gifts_remaining),
+            "availability_total": str(gift.availability_total),
+            "min_bid": str(state.min_bid_amount),
+            "min_bid_usd": fmt_usd(state.min_bid_amount),
+            "top_n": str(gift.gifts_per_round or len(bids)),
+            "bids": "\n".join([bid_row(b.pos, b.amount) for b in bids]),
+            "updated": fmt_ts(int(ts)),
+        })
+        self.renders += 1
+        self.render_seconds += time.perf_counter() - t0
+        return text
+
+    def render_finished(self, state: AuctionState, stats: AuctionStats, now: float | None = None) -> str:
+        gift = state.gift
+        start_ts = state.start_date
+        end_ts = state.end_date
+        round_lines = "\n".join(
+            f"{r.round}. {fmt_stars(r.clearing_price)} – {fmt_stars(r.top_price)} {PLAIN_STAR}" for r in stats.rounds
+        )
+        return self.finished.render({
+            "header": self.header(gift.slug, gift.title),
+            "started": f"<b>Auction started:</b> {fmt_dt(start_ts)}" if start_ts else "",
+            "ended": f"<b>Auction ended:</b> {fmt_dt(end_ts)}" if end_ts else "",
+            "average": fmt_stars(stats.average_price),
+            "median": fmt_stars(stats.median_price),
+            "p10": fmt_stars(stats.p10),
+            "p90": fmt_stars(stats.p90),
+            "dispersion": fmt_stars(stats.dispersion),
+            "volume": fmt_stars(stats.volume),
+            "lasted": fmt_duration((end_ts - start_ts) if (start_ts and end_ts) else 0),
+            "rounds_block": f"<b>Clearing price by round:</b>\n<blockquote expandable>{round_lines}</blockquote>" if round_lines else "",
+            "updated": fmt_ts(int(time.time() if now is None else now)),
+        })
+
+    def round_ended(self, text: str) -> str:
+        lines = text.split("\n")
+        if len(lines) > COUNTDOWN_LINE:
+            lines[COUNTDOWN_LINE] = self.ended_line
+        return "\n".join(lines)
+
+    @property
+    def mean_render_ms(self) -> float:
+        return self.render_seconds / self.renders * 1000 if self.renders else 0.0
@@ -0,0 +1,106 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Awaitable, Callable
+from loguru import logger
+from auction.metrics import POLL_LAG
+
+Job = Callable[[], Awaitable[float | None]]
+
+
+class PollScheduler:
+    def __init__(
+        self,
+        max_inflight: int = 4,
+        spacing: float = 0.25,
+        retry_delay: float = 10.0,
+        speed: float = 1.0,
+    ) -> None:
+        self.max_inflight = max_inflight
+        self.spacing = spacing
+        self.retry_delay = retry_delay
+        self.speed = speed
+        self._heap: list[tuple[float, int, str]] = []
+        self._jobs: dict[str, tuple[Job, int]] = {}
+        self._running: dict[str, asyncio.Task] = {}
+        self._seq = itertools.count()
+        self._wake = asyncio.Event()
+        self._slots = asyncio.Semaphore(max_inflight)
+        self._last_dispatch = 0.0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._jobs
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    @property
+    def inflight(self) -> int:
+        return len(self._running)
+
+    def schedule(self, key: str, job: Job, delay: float = 0.0) -> None:
+        seq = next(self._seq)
+        self._jobs[key] = (job, seq)
+        heapq.heappush(self._heap, (time.monotonic() + max(0.0, delay) / self.speed, seq, key))
+        self._wake.set()
+
+    def cancel(self, key: str) -> None:
+        self._jobs.pop(key, None)
+        task = self._running.pop(key, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    def _current(self, key: str, seq: int) -> Job | None:
+        entry = self._jobs.get(key)
+        if entry is None or entry[1] != seq:
+            return None
+        return entry[0]
+
+    async def _run_job(self, key: str, job: Job, seq: int) -> None:
+        try:
+            delay = await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.bind(slug=key).error(f"Update loop error: {e}")
+            delay = self.retry_delay
+        finally:
+            self._slots.release()
+            self._running.pop(key, None)
+        if self._current(key, seq) is None:
+            return
+        if delay is None:
+            self._jobs.pop(key, None)
+            return
+        self.schedule(key, job, delay)
+
+    async def run(self) -> None:
+        while True:
+            self._wake.clear()
+            if not self._heap:
+                await self._wake.wait()
+                continue
+            deadline, seq, key = self._heap[0]
+            job = self._current(key, seq)
+            if job is None:
+                heapq.heappop(self._heap)
+                continue
+            wait = max(deadline, self._last_dispatch + self.spacing) - time.monotonic()
+            if wait > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._heap)
+            if key in self._running:
+                heapq.heappush(self._heap, (time.monotonic() + self.spacing, seq, key))
+                continue
+            await self._slots.acquire()
+            if self._current(key, seq) is None:
+                self._slots.release()
+                continue
+            self._last_dispatch = time.monotonic()
+            POLL_LAG.observe(max(0.0, self._last_dispatch - deadline))
+            self._running[key] = asyncio.create_task(self._run_job(key, job, seq))
@@ -0,0 +1,91 @@
+import asyncio
+from dataclasses import dataclass
+from auction.history import LEVEL_WIDTH, SNAP_FIELDS, SNAP_WIDTH, HistoryRecorder, Series, series_from_state
+from auction.models import AuctionState
+
+_ROUND = SNAP_FIELDS.index("round")
+_START = SNAP_FIELDS.index("level_start")
+_COUNT = SNAP_FIELDS.index("level_count")
+
+
+@dataclass(slots=True, frozen=True)
+class RoundStats:
+    round: int
+    clearing_price: int
+    top_price: int
+    median_price: float
+    winners: int
+
+
+@dataclass(slots=True, frozen=True)
+class AuctionStats:
+    snapshots: int
+    rounds: tuple[RoundStats, ...]
+    winners: int
+    average_price: float
+    median_price: float
+    p10: float
+    p25: float
+    p75: float
+    p90: float
+    dispersion: float
+    volume: int
+
+
+EMPTY = AuctionStats(0, (), 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0)
+
+
+def compute_stats(series: Series, per_round: int) -> AuctionStats:
+    if not len(series):
+        return EMPTY
+    import numpy as np
+
+    snaps = np.frombuffer(series.snaps, dtype=np.int64).reshape(-1, SNAP_WIDTH)[series.start: series.stop]
+    levels = np.frombuffer(series.level_data, dtype=np.int64).reshape(-1, LEVEL_WIDTH)
+    rounds = snaps[:, _ROUND]
+    closing = np.flatnonzero(np.append(rounds[1:] != rounds[:-1], True))
+    starts = snaps[closing, _START]
+    counts = snaps[closing, _COUNT]
+    if per_round:
+        counts = np.minimum(counts, per_round)
+    keep = counts > 0
+    closing, starts, counts = closing[keep], starts[keep], counts[keep]
+    total = int(counts.sum())
+    if not total:
+        return AuctionStats(len(series), (), 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0)
+    group_start = np.cumsum(counts) - counts
+    offsets = np.repeat(starts - group_start, counts) + np.arange(total)
+    amounts = levels[offsets, 1]
+    clearing = np.minimum.reduceat(amounts, group_start)
+    top = np.maximum.reduceat(amounts, group_start)
+    per_round_stats = tuple(
+        RoundStats(
+            round=int(rounds[c]),
+            clearing_price=int(clearing[i]),
+            top_price=int(top[i]),
+            median_price=float(np.median(amounts[group_start[i]: group_start[i] + counts[i]])),
+            winners=int(counts[i]),
+        )
+        for i, c in enumerate(closing)
+    )
+    p10, p25, p50, p75, p90 = np.percentile(amounts, [10, 25, 50, 75, 90])
+    return AuctionStats(
+        snapshots=len(series),
+        rounds=per_round_stats,
+        winners=total,
+        average_price=float(amounts.mean()),
+        median_price=float(p50),
+        p10=float(p10),
+        p25=float(p25),
+        p75=float(p75),
+        p90=float(p90),
+        dispersion=float(amounts.std()),
+        volume=int(amounts.sum()),
+    )
+
+
+async def summarize(recorder: HistoryRecorder | None, state: AuctionState) -> AuctionStats:
+    series = recorder.read(state.gift.slug) if recorder is not None else series_from_state(state)
+    if not len(series):
+        series = series_from_state(state)
+    return await asyncio.to_thread(compute_stats, series, state.gift.gifts_per_round)
@@ -0,0 +1,76 @@
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class FlowRecord:
+    key: str
+    round: int
+    fingerprint: str
+    texts: dict[str, str]
+    finished: bool
+
+
+def _record(r: tuple) -> FlowRecord:
+    return FlowRecord(r[0], r[1], r[2], json.loads(r[3]), bool(r[4]))
+
+
+class TrackerStore:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS auctions ("
+            "key TEXT PRIMARY KEY, round INTEGER NOT NULL, fingerprint TEXT NOT NULL, "
+            "texts TEXT NOT NULL, finished INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "dest TEXT NOT NULL, key TEXT NOT NULL, msg_id INTEGER NOT NULL, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (dest, key))"
+        )
+
+    def load_all(self) -> dict[str, FlowRecord]:
+        rows = self.db.execute("SELECT key, round, fingerprint, texts, finished FROM auctions").fetchall()
+        return {r[0]: _record(r) for r in rows}
+
+    def load(self, key: str) -> FlowRecord | None:
+        r = self.db.execute(
+            "SELECT key, round, fingerprint, texts, finished FROM auctions WHERE key = ?", (key,)
+        ).fetchone()
+        return _record(r) if r else None
+
+    def save(self, rec: FlowRecord) -> None:
+        self.db.execute(
+            "INSERT INTO auctions (key, round, fingerprint, texts, finished, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET round = excluded.round, fingerprint = excluded.fingerprint, "
+            "texts = excluded.texts, finished = excluded.finished, updated_at = excluded.updated_at",
+            (rec.key, rec.round, rec.fingerprint, json.dumps(rec.texts), int(rec.finished), time.time()),
+        )
+
+    def load_messages(self, dest: str) -> dict[str, int]:
+        rows = self.db.execute("SELECT key, msg_id FROM messages WHERE dest = ?", (dest,)).fetchall()
+        return {r[0]: r[1] for r in rows}
+
+    def load_message(self, dest: str, key: str) -> int | None:
+        r = self.db.execute("SELECT msg_id FROM messages WHERE dest = ? AND key = ?", (dest, key)).fetchone()
+        return r[0] if r else None
+
+    def save_message(self, dest: str, key: str, msg_id: int) -> None:
+        self.db.execute(
+            "INSERT INTO messages (dest, key, msg_id, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(dest, key) DO UPDATE SET msg_id = excluded.msg_id, updated_at = excluded.updated_at",
+            (dest, key, msg_id, time.time()),
+        )
+
+    def delete(self, key: str) -> None:
+        self.db.execute("DELETE FROM auctions WHERE key = ?", (key,))
+        self.db.execute("DELETE FROM messages WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        self.db.close()
@@ -0,0 +1,112 @@
+import time
+from dataclasses import replace
+from typing import Any
+from pyrogram.raw import functions as raw_functions
+from pyrogram.raw import types as raw_types
+from auction.clock import ServerClock
+from auction.models import AuctionState, GiftInfo, auction_key
+from auction.ratelimit import RateLimiter
+from auction.transport import RpcTransport
+
+
+def input_auction(gift: Any) -> Any:
+    if getattr(gift, "auction_slug", None):
+        return raw_types.InputStarGiftAuctionSlug(slug=gift.auction_slug)
+    return raw_types.InputStarGiftAuction(gift_id=gift.id)
+
+
+class AuctionStateTracker:
+    def __init__(
+        self,
+        app: RpcTransport,
+        gift: Any,
+        limiter: RateLimiter | None = None,
+        clock: ServerClock | None = None,
+    ) -> None:
+        self.app = app
+        self.limiter = limiter
+        self.clock = clock if clock is not None else ServerClock()
+        self.slug = auction_key(gift)
+        self.auction = input_auction(gift)
+        self.version = 0
+        self.polls = 0
+        self.not_modified = 0
+        self.pushes = 0
+        self.stale = 0
+        self.last_push_at = 0.0
+        self._pushed = False
+        self.gift = GiftInfo.from_tl(gift)
+        self.state: AuctionState | None = None
+
+    def reset(self) -> None:
+        self.version = 0
+        self.state = None
+
+    def _apply(self, res: Any) -> None:
+        st = getattr(res, "state", None)
+        timeout = getattr(res, "timeout", None)
+        if st is None or isinstance(st, raw_types.StarGiftAuctionStateNotModified):
+            if self.state is None:
+                raise RuntimeError(f"Auction {self.slug}: not modified without a cached state")
+            self.not_modified += 1
+            if timeout and timeout != self.state.timeout:
+                self.state = replace(self.state, timeout=int(timeout))
+            return
+        version = getattr(st, "version", None)
+        if self.state is not None and version is not None and version < self.version:
+            self.stale += 1
+            return
+        gift = getattr(res, "gift", None)
+        if gift is not None:
+            self.gift = GiftInfo.from_tl(gift)
+        state = AuctionState.from_tl(st, self.gift, self.state)
+        if timeout:
+            state = replace(state, timeout=int(timeout))
+        self.state = state
+        self.version = state.version or self.version
+
+    def push(self, st: Any) -> bool:
+        if self.state is None or isinstance(st, raw_types.StarGiftAuctionStateNotModified):
+            return False
+        version = getattr(st, "version", None)
+        if version is not None and version <= self.version:
+            return False
+        self.state = AuctionState.from_tl(st, self.gift, self.state)
+        self.version = self.state.version or self.version
+        self.pushes += 1
+        self.last_push_at = time.monotonic()
+        self._pushed = True
+        return True
+
+    async def _invoke(self, query: Any) -> Any:
+        sent_at = time.time()
+        if self.limiter is not None:
+            res = await self.limiter.invoke(self.app, query)
+        else:
+            res = await self.app.invoke(query)
+        self.clock.sample(self.app, sent_at, time.time())
+        return res
+
+    async def fetch(self) -> AuctionState:
+        if self._pushed:
+            self._pushed = False
+            return self.state
+        res = await self._invoke(
+            raw_functions.payments.GetStarGiftAuctionState(
+                auction=self.auction,
+                version=self.version,
+            )
+        )
+        self.polls += 1
+        try:
+            self._apply(res)
+        except RuntimeError:
+            self.reset()
+            res = await self._invoke(
+                raw_functions.payments.GetStarGiftAuctionState(
+                    auction=self.auction,
+                    version=0,
+                )
+            )
+            self._apply(res)
+        return self.state
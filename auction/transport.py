@@ -0,0 +1,11 @@
+from typing import Any, Protocol
+
+
+class RpcTransport(Protocol):
+    async def invoke(self, query: Any) -> Any: ...
+
+
+class ChatTransport(Protocol):
+    async def send(self, chat: Any, text: str, key: str = "") -> int: ...
+
+    async def edit(self, chat: Any, message_id: int, text: str, key: str = "") -> None: ...
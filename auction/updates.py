@@ -0,0 +1,45 @@
+import time
+from typing import Any, Callable
+from loguru import logger
+from pyrogram import Client
+from pyrogram.handlers import RawUpdateHandler
+from pyrogram.raw import types as raw_types
+
+PushCallback = Callable[[Any], None]
+
+
+class PushHub:
+    def __init__(self) -> None:
+        self.routes: dict[int, PushCallback] = {}
+        self.received = 0
+        self.unrouted = 0
+        self.last_push_at = 0.0
+
+    def subscribe(self, gift_id: int, callback: PushCallback) -> None:
+        self.routes[gift_id] = callback
+
+    def unsubscribe(self, gift_id: int) -> None:
+        self.routes.pop(gift_id, None)
+
+    def dispatch(self, update: Any) -> bool:
+        if not isinstance(update, raw_types.UpdateStarGiftAuctionState):
+            return False
+        self.received += 1
+        self.last_push_at = time.monotonic()
+        callback = self.routes.get(update.gift_id)
+        if callback is None:
+            self.unrouted += 1
+            return False
+        try:
+            callback(update.state)
+        except Exception as e:
+            logger.error(f"Push update for gift {update.gift_id} failed: {e}")
+            return False
+        return True
+
+    async def _on_raw_update(self, client: Client, update: Any, users: Any, chats: Any) -> None:
+        self.dispatch(update)
+
+    def attach(self, app: Client) -> None:
+        app.add_handler(RawUpdateHandler(self._on_raw_update), group=-1)
+
@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import math
+import os
+import re
+import statistics
+import time
+from auction.engine import Engine
+from auction.fake import AuctionScript, FakeChat, FakeGift, FakeTelegram, ScaledClock, script_from_series, synthetic_script
+from auction.flow import Cadence, Sink
+from auction.history import HistoryRecorder
+from auction.publisher import Publisher
+from auction.ratelimit import RateLimiter
+from auction.render import BOT_API, Renderer
+from auction.scheduler import PollScheduler
+
+_POST = re.compile(r"t\.me/auction/([^\"]+)\".*?Total Rounds:</b> (\d+)/", re.S)
+
+
+def transition_latencies(chat: FakeChat, scripts: dict) -> list[float]:
+    latencies = []
+    for at, kind, _, _, text in chat.events:
+        m = _POST.search(text) if kind == "send" else None
+        if m is None or int(m.group(2)) <= 1:
+            continue
+        script = scripts[m.group(1)]
+        boundaries = script.boundaries
+        if at >= script.end or int(m.group(2)) - 2 >= len(boundaries):
+            continue
+        boundary = boundaries[int(m.group(2)) - 2]
+        if at >= boundary:
+            latencies.append(at - boundary)
+    return latencies
+
+
+def history_scripts(root: str) -> list[AuctionScript]:
+    recorder = HistoryRecorder(root)
+    scripts = []
+    for name in sorted(os.listdir(root)):
+        if not os.path.isdir(os.path.join(root, name)):
+            continue
+        series = recorder.read(name)
+        if not len(series):
+            continue
+        _, _, first_round, _, gifts_left, _, _ = series.row(0)
+        rounds = max(series.column("round"))
+        per_round = math.ceil(gifts_left / max(1, rounds - first_round + 1))
+        total = gifts_left + (first_round - 1) * per_round
+        gift = FakeGift(len(scripts) + 1, name, name, total, gifts_left, per_round)
+        scripts.append(script_from_series(series, gift))
+    recorder.close()
+    return scripts
+
+
+async def replay(auctions: int, speed: float, rounds: int, round_seconds: int, flood: bool, linger: float = 60.0) -> dict:
+    start = int(time.time()) + 5
+    scripts = [
+        synthetic_script(
+            1000 + i,
+            start + i % 30,
+            rounds=rounds,
+            round_seconds=round_seconds,
+            floods=((start + round_seconds / 2, start + round_seconds / 2 + 20),) if flood and i % 10 == 0 else (),
+        )
+        for i in range(auctions)
+    ]
+    return await replay_scripts(scripts, speed, linger)
+
+
+async def replay_scripts(scripts: list[AuctionScript], speed: float, linger: float = 60.0) -> dict:
+    first = min(s.start for s in scripts)
+    clock = ScaledClock(speed, origin=first - 5)
+    backend = FakeTelegram(scripts, clock, linger=linger)
+    chat = FakeChat(clock)
+    limiter = RateLimiter(
+        limits={name: (1e6, 1e6) for name in ("GetStarGifts", "GetStarGiftAuctionState", "send_message", "edit_message_text")},
+        chat_limit=(1e6, 1e6),
+    )
+    sink = Sink("fake", Renderer(BOT_API), Publisher.for_chats("fake", [-1], chat, limiter))
+    engine = Engine(
+        backend,
+        [sink],
+        limiter,
+        cadence=Cadence(),
+        clock=clock,
+        scheduler=PollScheduler(max_inflight=16, spacing=0.25 / speed, speed=speed),
+    )
+    wall = time.perf_counter()
+    duration = (max(s.end for s in scripts) - first + 95) / speed
+    try:
+        await asyncio.wait_for(engine.run(), duration)
+    except asyncio.TimeoutError:
+        pass
+    wall = time.perf_counter() - wall
+    latencies = transition_latencies(chat, {s.gift.auction_slug: s for s in scripts})
+    finished = sum(1 for _, kind, _, _, text in chat.events if kind == "send" and "has <b>finished</b>" in text)
+    return {
+        "auctions": len(scripts),
+        "speed": speed,
+        "wall_seconds": round(wall, 2),
+        "rpc_calls": dict(backend.calls),
+        "flood_waits": backend.flood_waits,
+        "sends": sum(1 for e in chat.events if e[1] == "send"),
+        "edits": sum(1 for e in chat.events if e[1] == "edit"),
+        "finished_posts": finished,
+        "transitions": len(latencies),
+        "transition_p50": round(statistics.median(latencies), 2) if latencies else None,
+        "transition_max": round(max(latencies), 2) if latencies else None,
+        "render_ms": round(sink.renderer.mean_render_ms, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay synthetic auctions against the in-process fake backend")
+    parser.add_argument("--auctions", type=int, default=10)
+    parser.add_argument("--speed", type=float, default=30.0)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--round-seconds", type=int, default=120)
+    parser.add_argument("--flood", action="store_true")
+    parser.add_argument("--history", help="replay the auctions recorded under this HISTORY_DIR instead of synthetic ones")
+    parser.add_argument("--linger", type=float, default=60.0, help="seconds an auction stays in the catalogue after its end; negative drops it early")
+    args = parser.parse_args()
+    if args.history:
+        scripts = history_scripts(args.history)
+        if not scripts:
+            parser.error(f"no recorded auctions under {args.history}")
+        result = asyncio.run(replay_scripts(scripts, args.speed, args.linger))
+    else:
+        result = asyncio.run(replay(args.auctions, args.speed, args.rounds, args.round_seconds, args.flood, args.linger))
+    width = max(len(k) for k in result)
+    for name, value in result.items():
+        print(f"{name:<{width}}  {value}")
+
+
+if __name__ == "__main__":
+    main()
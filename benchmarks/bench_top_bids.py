@@ -0,0 +1,56 @@
+import random
+import time
+import timeit
+from dataclasses import replace
+from auction.models import AuctionState, BidLevel, GiftInfo
+from auction.render import MTPROTO, Renderer, fmt_usd
+
+
+def synthetic_state(levels: int = 10_000, per_round: int = 50, seed: int = 1) -> AuctionState:
+    rnd = random.Random(seed)
+    amounts = sorted((rnd.randint(100, 500_000) for _ in range(levels)), reverse=True)
+    gift = GiftInfo(1, "bench", "Bench Gift", levels * 2, levels, per_round)
+    return AuctionState(
+        gift=gift,
+        version=1,
+        next_round_at=int(time.time()) + 600,
+        current_round=3,
+        total_rounds=20,
+        gifts_left=levels,
+        min_bid_amount=amounts[-1],
+        bid_levels=tuple(BidLevel(i + 1, a) for i, a in enumerate(amounts)),
+        ordered=True,
+    )
+
+
+def timed(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    ordered = synthetic_state()
+    shuffled_levels = list(ordered.bid_levels)
+    random.Random(2).shuffle(shuffled_levels)
+    shuffled = replace(ordered, bid_levels=tuple(shuffled_levels), ordered=False)
+    n = ordered.gift.gifts_per_round
+
+    results = {
+        "full sort (baseline)": timed(lambda: sorted(shuffled.bid_levels, key=lambda x: x.pos)[:n], 50),
+        "heapq.nsmallest": timed(shuffled.top_bids, 50),
+        "server order slice": timed(ordered.top_bids, 5000),
+        "fmt_usd cold": timed(lambda: (fmt_usd.cache_clear(), [fmt_usd(b.amount) for b in ordered.bid_levels[:n]]), 500),
+        "fmt_usd warm": timed(lambda: [fmt_usd(b.amount) for b in ordered.bid_levels[:n]], 5000),
+    }
+    renderer = Renderer(MTPROTO)
+    for levels in (100, 1_000, 10_000):
+        state = synthetic_state(levels)
+        renderer.render(state)
+        results[f"render {levels} levels"] = timed(lambda: renderer.render(state), 2000)
+
+    width = max(len(k) for k in results)
+    for name, us in results.items():
+        print(f"{name:<{width}}  {us:10.2f} us")
+
+
+if __name__ == "__main__":
+    main()
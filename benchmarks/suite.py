@@ -0,0 +1,175 @@
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import timeit
+from dataclasses import replace
+from typing import Any, Awaitable, Callable
+from auction.fake import FakeTelegram, ScaledClock, synthetic_script
+from auction.flow import AuctionFlow, Cadence, Sink
+from auction.models import AuctionState, GiftInfo
+from auction.publisher import Publisher
+from auction.render import BOT_API, MTPROTO, Renderer, fmt_delta, fmt_usd
+from auction.tracker import AuctionStateTracker
+
+AUCTIONS = (1, 10, 100)
+LEVELS = {"small": 20, "large": 2000}
+REPEAT = 5
+
+
+def fixture(gift_id: int, levels: int) -> tuple[Any, Any]:
+    script = synthetic_script(gift_id, start=1_700_000_000, rounds=3, round_seconds=300, per_round=50, levels=levels)
+    raw = script.state_at(script.frames[1].at, 0)
+    return script, raw
+
+
+def measure(fn: Callable[[], Any]) -> dict[str, float]:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    runs = [t / number for t in timer.repeat(REPEAT, number)]
+    return {"number": number, "min_us": min(runs) * 1e6, "median_us": statistics.median(runs) * 1e6}
+
+
+async def measure_async(fn: Callable[[], Awaitable[Any]], number: int) -> dict[str, float]:
+    await fn()
+    runs = []
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            await fn()
+        runs.append((time.perf_counter() - t0) / number)
+    return {"number": number, "min_us": min(runs) * 1e6, "median_us": statistics.median(runs) * 1e6}
+
+
+def bench_convert(levels: int) -> dict[str, float]:
+    script, raw = fixture(1, levels)
+    gift = GiftInfo.from_tl(script.gift)
+    return measure(lambda: AuctionState.from_tl(raw, gift))
+
+
+def bench_render(levels: int, flavour: Any) -> dict[str, float]:
+    script, raw = fixture(1, levels)
+    state = AuctionState.from_tl(raw, GiftInfo.from_tl(script.gift))
+    renderer = Renderer(flavour)
+    return measure(lambda: renderer.render(state))
+
+
+def bench_top_bids(levels: int, ordered: bool) -> dict[str, float]:
+    script, raw = fixture(1, levels)
+    state = AuctionState.from_tl(raw, GiftInfo.from_tl(script.gift))
+    if not ordered:
+        shuffled = list(state.bid_levels)
+        random.Random(2).shuffle(shuffled)
+        state = replace(state, bid_levels=tuple(shuffled), ordered=False)
+    return measure(state.top_bids)
+
+
+def bench_fingerprint(levels: int) -> dict[str, float]:
+    script, raw = fixture(1, levels)
+    state = AuctionState.from_tl(raw, GiftInfo.from_tl(script.gift))
+    return measure(state.fingerprint)
+
+
+def bench_fmt_usd(cold: bool) -> dict[str, float]:
+    amounts = [random.Random(3).randint(100, 500_000) for _ in range(100)]
+    if cold:
+        return measure(lambda: (fmt_usd.cache_clear(), [fmt_usd(a) for a in amounts]))
+    return measure(lambda: [fmt_usd(a) for a in amounts])
+
+
+def bench_fmt_delta() -> dict[str, float]:
+    seconds = list(range(0, 100_000, 1000))
+    return measure(lambda: [fmt_delta(s) for s in seconds])
+
+
+def flows_for(auctions: int, levels: int) -> tuple[list[AuctionFlow], ScaledClock, list[float]]:
+    scripts = [synthetic_script(1000 + i, start=1_700_000_000, rounds=3, round_seconds=300, levels=levels) for i in range(auctions)]
+    frames = [scripts[0].frames[1].at, scripts[0].frames[2].at]
+    clock = ScaledClock(speed=0.0, origin=frames[0])
+    backend = FakeTelegram(scripts, clock)
+    sinks = [Sink("bot", Renderer(BOT_API), Publisher([])), Sink("userbot", Renderer(MTPROTO), Publisher([]))]
+    flows = [
+        AuctionFlow(AuctionStateTracker(backend, s.gift, clock=clock), sinks, cadence=Cadence(stale_after=0))
+        for s in scripts
+    ]
+    return flows, clock, frames
+
+
+async def bench_poll(auctions: int, levels: int, changed: bool) -> dict[str, float]:
+    flows, clock, frames = flows_for(auctions, levels)
+    for f in flows:
+        await f.step()
+    tick = [0]
+
+    async def poll() -> None:
+        if changed:
+            tick[0] ^= 1
+            clock.origin = frames[tick[0]]
+        await asyncio.gather(*(f.step() for f in flows))
+
+    return await measure_async(poll, max(1, 200 // auctions))
+
+
+def cases() -> list[tuple[str, dict[str, Any], Callable[[], Any]]]:
+    out: list[tuple[str, dict[str, Any], Callable[[], Any]]] = []
+    for size, n in LEVELS.items():
+        out.append(("convert", {"levels": size}, lambda n=n: bench_convert(n)))
+        out.append(("render", {"levels": size, "flavour": "mtproto"}, lambda n=n: bench_render(n, MTPROTO)))
+        out.append(("render", {"levels": size, "flavour": "bot_api"}, lambda n=n: bench_render(n, BOT_API)))
+        out.append(("top_bids", {"levels": size, "ordered": True}, lambda n=n: bench_top_bids(n, True)))
+        out.append(("top_bids", {"levels": size, "ordered": False}, lambda n=n: bench_top_bids(n, False)))
+        out.append(("fingerprint", {"levels": size}, lambda n=n: bench_fingerprint(n)))
+    out.append(("fmt_usd", {"cache": "cold"}, lambda: bench_fmt_usd(True)))
+    out.append(("fmt_usd", {"cache": "warm"}, lambda: bench_fmt_usd(False)))
+    out.append(("fmt_delta", {}, bench_fmt_delta))
+    for auctions in AUCTIONS:
+        for size, n in LEVELS.items():
+            for changed in (False, True):
+                out.append(
+                    (
+                        "poll",
+                        {"auctions": auctions, "levels": size, "state": "changed" if changed else "unchanged"},
+                        lambda a=auctions, n=n, c=changed: asyncio.run(bench_poll(a, n, c)),
+                    )
+                )
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-poll pipeline benchmarks")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("-k", dest="match", default="", help="only run benchmarks whose name contains this")
+    args = parser.parse_args()
+
+    results = []
+    for name, params, run in cases():
+        if args.match not in name:
+            continue
+        r = run()
+        results.append({"name": name, "params": params, **{k: round(v, 3) for k, v in r.items()}})
+        label = name + "".join(f" {k}={v}" for k, v in params.items())
+        print(f"{label:<55} {r['min_us']:12.2f} us", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "timestamp": int(time.time()),
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+from loguru import logger
+from dotenv import load_dotenv
+from auction.config import load_settings, run_engine
+from auction.launcher import launch
+from auction.logs import setup_logging
+
+load_dotenv()
+setup_logging("auction")
+
+async def run() -> None:
+    load_dotenv()
+    settings = load_settings(state_db="state.db")
+    if settings is not None:
+        await run_engine(settings)
+
+async def main() -> None:
+    try:
+        await run()
+    finally:
+        await logger.complete()
+
+
+if __name__ == "__main__":
+    launch(main)
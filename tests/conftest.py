@@ -0,0 +1,29 @@
+import asyncio
+from typing import Any
+import pytest
+from auction.ratelimit import RateLimiter
+
+
+def _publishers(target: Any) -> list[Any]:
+    return [s.publisher for s in target.sinks] if hasattr(target, "sinks") else [target]
+
+
+async def _drain(target: Any) -> None:
+    publishers = _publishers(target)
+    for p in publishers:
+        p.start()
+    for _ in range(100):
+        await asyncio.sleep(0)
+        if all(not d.pending for p in publishers for d in p.destinations):
+            break
+    await asyncio.sleep(0)
+
+
+@pytest.fixture
+def limiter() -> RateLimiter:
+    return RateLimiter(limits={}, default=(1e6, 1e6), chat_limit=(1e6, 1e6))
+
+
+@pytest.fixture
+def drain():
+    return _drain
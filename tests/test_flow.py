@@ -0,0 +1,130 @@
+import asyncio
+from auction.engine import Engine
+from auction.fake import AuctionScript, FakeChat, FakeGift, FakeTelegram, Keyframe, ManualClock, script_from_series, synthetic_script
+from auction.flow import Cadence, Sink
+from auction.history import HistoryRecorder
+from auction.metrics import REGISTRY
+from auction.models import AuctionState, GiftInfo
+from auction.publisher import Publisher
+from auction.ratelimit import RateLimiter
+from auction.render import BOT_API, Renderer
+from auction.scheduler import PollScheduler
+
+START = 1_000
+
+
+def make_engine(script: AuctionScript, clock: ManualClock, limiter: RateLimiter) -> tuple[Engine, FakeChat]:
+    chat = FakeChat(clock)
+    sink = Sink("fake", Renderer(BOT_API), Publisher.for_chats("fake", [-1], chat, limiter))
+    engine = Engine(FakeTelegram([script], clock), [sink], limiter, cadence=Cadence(), clock=clock, scheduler=PollScheduler())
+    return engine, chat
+
+
+def kinds(chat: FakeChat) -> list[tuple[str, int, str]]:
+    return [(kind, msg_id, text) for _, kind, _, msg_id, text in chat.events]
+
+
+def test_round_ended_new_round_finish_and_retire(limiter, drain) -> None:
+    async def scenario() -> None:
+        clock = ManualClock(START)
+        script = synthetic_script(1, START, rounds=2, round_seconds=60, bid_interval=15)
+        engine, chat = make_engine(script, clock, limiter)
+        flow = engine.track(script.gift, schedule=False)
+        key = flow.slug
+
+        assert await engine._step(flow) is not None
+        await drain(engine)
+        assert [(k, m) for k, m, _ in kinds(chat)] == [("send", 1)]
+        assert "Total Rounds:</b> 1/2" in chat.messages[(-1, 1)]
+        assert "Next Round In:</b> 1m 0s" in chat.messages[(-1, 1)]
+        assert "Last Update:</b> 1970-01-01 00:16:40 UTC" in chat.messages[(-1, 1)]
+
+        clock.advance(59)
+        delay = await engine._step(flow)
+        assert 1 <= delay <= 1.5
+        await drain(engine)
+        assert len(chat.events) == 1
+
+        clock.advance(1.2)
+        await engine._step(flow)
+        await drain(engine)
+        events = kinds(chat)[1:]
+        assert events[0][:2] == ("edit", 1) and "Round Ended" in events[0][2]
+        assert events[1][:2] == ("send", 2) and "Total Rounds:</b> 2/2" in events[1][2]
+
+        clock.advance(60)
+        assert await engine._step(flow) is None
+        await drain(engine)
+        last = kinds(chat)[-1]
+        assert last[0] == "send" and "has <b>finished</b>" in last[2]
+        assert key not in engine.flows and key in engine.done
+        for sink in engine.sinks:
+            await sink.publisher.close()
+
+    asyncio.run(scenario())
+
+
+def test_engine_stats_are_exported(limiter, drain) -> None:
+    async def scenario() -> None:
+        clock = ManualClock(START)
+        script = synthetic_script(4, START, rounds=1, round_seconds=60, bid_interval=15)
+        engine, _ = make_engine(script, clock, limiter)
+        await engine._step(engine.track(script.gift, schedule=False))
+        await drain(engine)
+        engine.export_stats()
+        text = REGISTRY.expose()
+        dest = engine.sinks[0].publisher.destinations[0].name
+        assert f'auction_published_messages{{destination="{dest}",result="sent"}} 1' in text
+        assert f'auction_publish_queue{{destination="{dest}"}} 0' in text
+        assert 'auction_ratelimit_fill{limiter="poll",bucket="method:GetStarGiftAuctionState"}' in text
+        assert "auction_active_auctions 1" in text
+        for sink in engine.sinks:
+            await sink.publisher.close()
+
+    asyncio.run(scenario())
+
+
+def test_round_change_is_confirmed_with_backoff(limiter, drain) -> None:
+    async def scenario() -> None:
+        clock = ManualClock(START)
+        gift = FakeGift(2, "slow-round", "Slow Round", 20, 20, 10)
+        levels = tuple((i + 1, 500 - i) for i in range(10))
+        frames = [
+            Keyframe(START, 1, 1, START + 60, 20, 491, levels),
+            Keyframe(START + 62, 2, 2, START + 120, 10, 491, levels),
+        ]
+        script = AuctionScript(gift, frames, START, START + 120, 2)
+        engine, chat = make_engine(script, clock, limiter)
+        flow = engine.track(gift, schedule=False)
+        await engine._step(flow)
+
+        clock.advance(60.1)
+        delays = [await engine._step(flow)]
+        await drain(engine)
+        assert kinds(chat)[-1][:2] == ("edit", 1)
+        while clock.now() < START + 62:
+            clock.advance(delays[-1])
+            delays.append(await engine._step(flow))
+        await drain(engine)
+        assert delays[:3] == [0.25, 0.5, 1.0]
+        assert kinds(chat)[-1][:2] == ("send", 2)
+        assert [k for k, _, _ in kinds(chat)].count("send") == 2
+        for sink in engine.sinks:
+            await sink.publisher.close()
+
+    asyncio.run(scenario())
+
+
+def test_script_from_recorded_history(tmp_path) -> None:
+    source = synthetic_script(3, START, rounds=3, round_seconds=60, bid_interval=15)
+    recorder = HistoryRecorder(str(tmp_path))
+    for frame in source.frames:
+        raw = source.state_at(frame.at, 0)
+        recorder.append(source.gift.auction_slug, AuctionState.from_tl(raw, GiftInfo.from_tl(source.gift)), int(frame.at))
+
+    replayed = script_from_series(recorder.read(source.gift.auction_slug), source.gift)
+    recorder.close()
+    assert replayed.total_rounds == 3
+    assert replayed.boundaries == [START + 60, START + 120]
+    assert [f.version for f in replayed.frames] == [f.version for f in source.frames]
+    assert replayed.frames[-1].levels == source.frames[-1].levels
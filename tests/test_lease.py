@@ -0,0 +1,73 @@
+import asyncio
+import sqlite3
+from auction.engine import Engine
+from auction.fake import FakeChat, FakeTelegram, ManualClock, synthetic_script
+from auction.flow import Cadence, Sink
+from auction.lease import SqliteLeases
+from auction.publisher import Publisher
+from auction.render import BOT_API, Renderer
+from auction.scheduler import PollScheduler
+from auction.store import TrackerStore
+
+START = 1_000
+TTL = 0.3
+
+
+def test_other_node_takes_over_and_edits_the_stored_messages(tmp_path, limiter, drain) -> None:
+    async def scenario() -> None:
+        path = str(tmp_path / "state.db")
+        clock = ManualClock(START)
+        script = synthetic_script(11, START, rounds=1, round_seconds=3600, bid_interval=15)
+        backend = FakeTelegram([script], clock)
+        chat = FakeChat(clock)
+
+        def node(name: str) -> Engine:
+            store = TrackerStore(path)
+            sink = Sink("fake", Renderer(BOT_API), Publisher.for_chats("fake", [-1], chat, limiter, store))
+            return Engine(
+                backend,
+                [sink],
+                limiter,
+                cadence=Cadence(),
+                store=store,
+                clock=clock,
+                scheduler=PollScheduler(),
+                leases=SqliteLeases(path),
+                node=name,
+                lease_ttl=TTL,
+            )
+
+        a, b = node("a"), node("b")
+        await a.bootstrap()
+        await drain(a)
+        await b.bootstrap()
+        key = script.gift.auction_slug
+        assert list(a.flows) == [key] and not b.flows
+        assert b.leases.holders() == {key: "a"}
+        assert [(kind, msg_id) for _, kind, _, msg_id, _ in chat.events] == [("send", 1)]
+
+        def locked(node: str, ttl: float) -> set[str]:
+            raise sqlite3.OperationalError("database is locked")
+
+        a.leases.renew = locked
+        holder = asyncio.create_task(a._hold_leases())
+        await asyncio.sleep(TTL + 0.1)
+        assert not a.flows and key not in a.scheduler
+        holder.cancel()
+        await asyncio.gather(holder, return_exceptions=True)
+
+        await b.renew_leases()
+        assert list(b.flows) == [key] and b.leases.holders() == {key: "b"}
+        b.scheduler.cancel(key)
+        clock.advance(20)
+        await b._step(b.flows[key])
+        await drain(b)
+        assert [(kind, msg_id) for _, kind, _, msg_id, _ in chat.events] == [("send", 1), ("edit", 1)]
+
+        for engine in (a, b):
+            for sink in engine.sinks:
+                await sink.publisher.close()
+            engine.leases.close()
+            engine.store.close()
+
+    asyncio.run(scenario())
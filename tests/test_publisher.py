@@ -0,0 +1,86 @@
+import asyncio
+import time
+from auction.fake import FakeChat, ManualClock
+from auction.metrics import EDITS
+from auction.publisher import Destination, Priority, Publisher
+
+KEY = "gift-1"
+
+
+def make_publisher(limiter, refresh_ttl: float = 30.0) -> tuple[Publisher, Destination, FakeChat]:
+    chat = FakeChat(ManualClock(1_000))
+    dest = Destination(-1, chat, limiter, refresh_ttl=refresh_ttl)
+    return Publisher([dest]), dest, chat
+
+
+def events(chat: FakeChat) -> list[tuple[str, int, str]]:
+    return [(kind, msg_id, text) for _, kind, _, msg_id, text in chat.events]
+
+
+def test_finish_after_round_keeps_order_per_key(limiter, drain) -> None:
+    async def scenario() -> None:
+        publisher, _, chat = make_publisher(limiter)
+        publisher.post("other", "other round", Priority.ROUND)
+        publisher.post(KEY, "round 2", Priority.ROUND)
+        publisher.post(KEY, "finished", Priority.FINISH)
+        await drain(publisher)
+        assert events(chat) == [("send", 1, "round 2"), ("send", 2, "finished"), ("send", 3, "other round")]
+        await publisher.close()
+
+    asyncio.run(scenario())
+
+
+def test_round_ended_edit_after_the_new_post_edits_the_old_message(limiter, drain) -> None:
+    async def scenario() -> None:
+        publisher, dest, chat = make_publisher(limiter)
+        publisher.post(KEY, "round 1")
+        await drain(publisher)
+        await publisher.close()
+        publisher.edit(KEY, "round 1 ended", Priority.ROUND_ENDED)
+        publisher.post(KEY, "round 2")
+        ended, post = await dest._next(), await dest._next()
+        await dest._deliver(post)
+        await dest._deliver(ended)
+        assert events(chat)[1:] == [("send", 2, "round 2"), ("edit", 1, "round 1 ended")]
+        assert dest.msg_ids[KEY] == 2
+
+    asyncio.run(scenario())
+
+
+def test_refresh_collapses_and_is_dropped_by_a_post(limiter, drain) -> None:
+    async def scenario() -> None:
+        publisher, dest, chat = make_publisher(limiter)
+        publisher.post(KEY, "round 1")
+        await drain(publisher)
+        sent = EDITS.values.get(("sent",), 0)
+        publisher.edit(KEY, "bid 1")
+        publisher.edit(KEY, "bid 2")
+        assert dest.collapsed == 1 and dest.pending == 1
+        publisher.post(KEY, "round 2")
+        await drain(publisher)
+        assert dest.superseded == 1
+        assert events(chat) == [("send", 1, "round 1"), ("send", 2, "round 2")]
+        publisher.edit(KEY, "bid 3")
+        await drain(publisher)
+        assert events(chat)[-1] == ("edit", 2, "bid 3")
+        assert EDITS.values[("sent",)] == sent + 1
+        await publisher.close()
+
+    asyncio.run(scenario())
+
+
+def test_refresh_past_its_ttl_expires(limiter, drain) -> None:
+    async def scenario() -> None:
+        publisher, dest, chat = make_publisher(limiter, refresh_ttl=0.01)
+        publisher.post(KEY, "round 1")
+        await drain(publisher)
+        await publisher.close()
+        publisher.edit(KEY, "bid 1")
+        time.sleep(0.02)
+        publisher.post("other", "fresh")
+        await drain(publisher)
+        assert dest.expired == 1
+        assert events(chat) == [("send", 1, "round 1"), ("send", 2, "fresh")]
+        await publisher.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,93 @@
+import asyncio
+from auction.engine import Engine
+from auction.fake import FakeChat, FakeTelegram, FakeUpdateSource, ManualClock, synthetic_script
+from auction.flow import Cadence, Sink
+from auction.publisher import Publisher
+from auction.render import BOT_API, Renderer
+from auction.scheduler import PollScheduler
+from auction.updates import PushHub
+
+START = 1_000
+SILENCE = 90
+
+
+def test_push_rerenders_without_rpc_and_polling_resumes_after_silence(limiter, drain) -> None:
+    async def scenario() -> None:
+        clock = ManualClock(START)
+        script = synthetic_script(7, START, rounds=1, round_seconds=3600, bid_interval=15)
+        backend = FakeTelegram([script], clock, timeout=300)
+        chat = FakeChat(clock)
+        sink = Sink("fake", Renderer(BOT_API), Publisher.for_chats("fake", [-1], chat, limiter))
+        hub = PushHub()
+        engine = Engine(
+            backend,
+            [sink],
+            limiter,
+            cadence=Cadence(slow=10, fast=5, push_silence=SILENCE),
+            clock=clock,
+            scheduler=PollScheduler(),
+            push=hub,
+        )
+        source = FakeUpdateSource(hub)
+        flow = engine.track(script.gift, schedule=False)
+        await engine._step(flow)
+        await drain(engine)
+        polls = backend.calls["GetStarGiftAuctionState"]
+        assert polls == 1 and len(chat.events) == 1
+
+        clock.advance(20)
+        assert source.emit(script.gift.id, script.state_at(clock.now(), 0))
+        assert flow.slug in engine.scheduler
+        delay = await engine._step(flow)
+        await drain(engine)
+        assert backend.calls["GetStarGiftAuctionState"] == polls
+        assert flow.tracker.pushes == 1
+        assert chat.events[-1][1] == "edit"
+        assert delay > SILENCE - 5
+
+        engine.scheduler.cancel(flow.slug)
+        source.emit(script.gift.id, script.state_at(clock.now(), 0))
+        assert flow.slug not in engine.scheduler
+        assert not source.emit(999, script.state_at(clock.now(), 0)) and hub.unrouted == 1
+
+        flow.tracker.last_push_at -= SILENCE + 1
+        clock.advance(20)
+        delay = await engine._step(flow)
+        await drain(engine)
+        assert backend.calls["GetStarGiftAuctionState"] == polls + 1
+        assert delay == 10
+        await sink.publisher.close()
+
+    asyncio.run(scenario())
+
+
+def test_poll_reply_older_than_a_push_is_ignored(limiter) -> None:
+    async def scenario() -> None:
+        clock = ManualClock(START)
+        script = synthetic_script(8, START, rounds=1, round_seconds=3600, bid_interval=15)
+        backend = FakeTelegram([script], clock)
+        hub = PushHub()
+        sink = Sink("fake", Renderer(BOT_API), Publisher.for_chats("fake", [-1], FakeChat(clock), limiter))
+        engine = Engine(backend, [sink], limiter, clock=clock, scheduler=PollScheduler(), push=hub)
+        source = FakeUpdateSource(hub)
+        flow = engine.track(script.gift, schedule=False)
+        tracker = flow.tracker
+        assert (await tracker.fetch()).version == 1
+
+        poll = backend.invoke
+
+        async def invoke(query):
+            res = await poll(query)
+            source.emit(script.gift.id, script.state_at(START + 30, 0))
+            return res
+
+        backend.invoke = invoke
+        clock.advance(20)
+        state = await tracker.fetch()
+        assert state.version == 3 and tracker.version == 3 and tracker.stale == 1
+        backend.invoke = poll
+        polls = backend.calls["GetStarGiftAuctionState"]
+        assert (await tracker.fetch()).version == 3
+        assert backend.calls["GetStarGiftAuctionState"] == polls
+
+    asyncio.run(scenario())
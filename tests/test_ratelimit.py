@@ -0,0 +1,53 @@
+import asyncio
+import pytest
+from pyrogram.errors import FloodWait
+from auction.fake import FakeChat, ManualClock
+from auction.metrics import RPC_SECONDS
+from auction.pool import ChatMember, PooledChat, pooled_limiter
+from auction.publisher import Destination, Outbound
+from auction.ratelimit import RateLimiter
+
+
+async def flood() -> None:
+    raise FloodWait(value=30)
+
+
+async def ok() -> str:
+    return "sent"
+
+
+@pytest.mark.parametrize("scope, blocked", [("chat", False), ("method", True)])
+def test_flood_scope(scope: str, blocked: bool) -> None:
+    async def scenario() -> None:
+        limiter = RateLimiter(retries=0, flood_scope=scope)
+        with pytest.raises(FloodWait):
+            await limiter.call("send_message", flood, chat=-1)
+        assert limiter.chat_bucket(-1).fill == 0.0
+        assert (limiter.method_bucket("send_message").fill == 0.0) is blocked
+        if not blocked:
+            assert await asyncio.wait_for(limiter.call("send_message", ok, chat=-2), 1) == "sent"
+
+    asyncio.run(scenario())
+
+
+def test_flood_without_chat_blocks_the_method() -> None:
+    async def scenario() -> None:
+        limiter = RateLimiter(retries=0, flood_scope="chat")
+        with pytest.raises(FloodWait):
+            await limiter.call("GetStarGiftAuctionState", flood)
+        assert limiter.method_bucket("GetStarGiftAuctionState").fill == 0.0
+        assert limiter.flood_waits == 1
+
+    asyncio.run(scenario())
+
+
+def test_pooled_send_is_recorded_once(limiter) -> None:
+    async def scenario() -> None:
+        chat = FakeChat(ManualClock(1_000))
+        pool = PooledChat([ChatMember("bot:1", chat, limiter)])
+        dest = Destination(-1, pool, pooled_limiter(1))
+        before = sum(RPC_SECONDS.counts.get(("send_message",), [0]))
+        await dest._deliver(Outbound("post", "gift-1", "round 1"))
+        assert sum(RPC_SECONDS.counts[("send_message",)]) == before + 1
+
+    asyncio.run(scenario())